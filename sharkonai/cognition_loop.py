@@ -28,6 +28,7 @@ class CognitionLoop:
         self._task: asyncio.Task = None
         self._tick_count = 0
         self._brain = None  # Injected later for skill evolution
+        self.heartbeat = asyncio.Event()  # Set after every tick and when the loop exits; awaited by the watchdog
 
     def set_brain(self, brain):
         """Inject the brain reference for autonomous skill evolution."""
@@ -59,31 +60,36 @@ class CognitionLoop:
         """Main cognition loop."""
         log.info("Cognition loop entering main cycle...")
 
-        while self._running:
-            try:
-                await self._tick()
-                self._tick_count += 1
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                log.error(f"Cognition loop error: {e}", exc_info=True)
-
-            await asyncio.sleep(CONFIG.COGNITION_INTERVAL_SECONDS)
+        try:
+            while self._running:
+                try:
+                    await self._tick()
+                    self._tick_count += 1
+                    self.heartbeat.set()
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    log.error(f"Cognition loop error: {e}", exc_info=True)
+
+                await asyncio.sleep(CONFIG.COGNITION_INTERVAL_SECONDS)
+        finally:
+            self.heartbeat.set()  # Wake the watchdog so it notices the loop is gone
 
     async def _tick(self):
         """Single cognition tick — comprehensive system and memory health check."""
         now = datetime.utcnow().isoformat()
 
-        # ── Core heartbeat ──
-        await self.memory.set_state("last_heartbeat", now)
-        await self.memory.set_state("tick_count", str(self._tick_count))
-
         # ── Gather stats ──
         msg_count = await self.memory.get_message_count()
         action_count = await self.memory.get_action_count()
 
-        await self.memory.set_state("total_messages", str(msg_count))
-        await self.memory.set_state("total_actions", str(action_count))
+        # ── Core heartbeat + stats, one transaction ──
+        await self.memory.set_state_many({
+            "last_heartbeat": now,
+            "tick_count": str(self._tick_count),
+            "total_messages": str(msg_count),
+            "total_actions": str(action_count),
+        })
 
         # ── System health (every 5 ticks) ──
         if self._tick_count % 5 == 0:
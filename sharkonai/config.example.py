@@ -28,7 +28,6 @@ class Config:
     MAX_CONTEXT_MESSAGES: int = 50  # Increased for richer context
 
     # Watchdog
-    WATCHDOG_CHECK_INTERVAL: int = 30  # seconds
     MAX_RESTART_ATTEMPTS: int = 5
 
     # Logging
@@ -38,6 +37,8 @@ class Config:
     # Tool Execution
     CMD_TIMEOUT: int = 180  # seconds timeout for command execution (increased)
     TOOL_TIMEOUT: int = 120
+    MAX_OUTPUT_CHARS: int = 8000      # stdout/stderr kept per command or run_python call
+    MAX_FILE_READ_CHARS: int = 10000  # characters returned by read_file
 
     # Brain - Enhanced Reasoning
     MAX_CHAIN_STEPS: int = 25        # Max auto-continuation steps for multi-step tasks
@@ -60,6 +61,9 @@ class Config:
     # Common codes: 'fr-FR', 'en-US', 'ar-SA', 'es-ES', 'de-DE', 'zh-CN'
     VOICE_LANGUAGES: list = None  # Will be set in __post_init__
 
+    TRANSCRIPT_CACHE_TTL: int = 24 * 3600  # seconds a transcript is reused for identical audio
+    SPEECH_MAX_CONCURRENT: int = 4  # speech API requests in flight at once
+
     def __post_init__(self):
         if self.VOICE_LANGUAGES is None:
             self.VOICE_LANGUAGES = ["fr-FR", "en-US", "ar-SA"]
@@ -5,6 +5,7 @@ conversation summaries, and semantic context retrieval.
 """
 
 import json
+import time
 import sqlite3
 import asyncio
 from datetime import datetime
@@ -27,6 +28,7 @@ class Memory:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")  # WAL keeps this crash-safe; skips an fsync per commit
         conn.execute("PRAGMA foreign_keys=ON;")
         return conn
 
@@ -121,6 +123,13 @@ class Memory:
                     details TEXT DEFAULT '{}'
                 );
 
+                -- Voice transcript cache, keyed by audio digest + language
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+
                 CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
                 CREATE INDEX IF NOT EXISTS idx_messages_role ON messages(role);
                 CREATE INDEX IF NOT EXISTS idx_actions_timestamp ON actions(timestamp);
@@ -131,6 +140,7 @@ class Memory:
                 CREATE INDEX IF NOT EXISTS idx_goals_status ON goals(status);
                 CREATE INDEX IF NOT EXISTS idx_goals_priority ON goals(priority);
                 CREATE INDEX IF NOT EXISTS idx_activity_log_timestamp ON activity_log(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_transcripts_created ON transcripts(created_at);
             """)
             conn.commit()
             log.info("Memory database initialized successfully (enhanced schema).")
@@ -269,6 +279,22 @@ class Memory:
             finally:
                 conn.close()
 
+    async def set_state_many(self, mapping: dict[str, str]):
+        """Store or update several state key-value pairs in one transaction."""
+        now = datetime.utcnow().isoformat()
+        async with self._lock:
+            conn = self._get_conn()
+            try:
+                conn.executemany(
+                    """INSERT INTO state (key, value, updated_at)
+                       VALUES (?, ?, ?)
+                       ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at""",
+                    [(key, value, now) for key, value in mapping.items()],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
     async def get_state(self, key: str) -> Optional[str]:
         """Retrieve a state value by key."""
         async with self._lock:
@@ -281,6 +307,47 @@ class Memory:
             finally:
                 conn.close()
 
+    # ── Transcript cache ────────────────────────────────────────────────────
+
+    async def get_transcript(self, key: str, max_age: float) -> Optional[tuple]:
+        """Return (created_at, text) for a cached transcript younger than max_age seconds."""
+        async with self._lock:
+            conn = self._get_conn()
+            try:
+                row = conn.execute(
+                    "SELECT created_at, text FROM transcripts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if time.time() - row["created_at"] >= max_age:
+                    conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                return row["created_at"], row["text"]
+            finally:
+                conn.close()
+
+    async def store_transcript(self, key: str, text: str, created_at: float,
+                               max_age: float, max_rows: int):
+        """Cache a transcript, pruning expired rows and keeping at most max_rows."""
+        async with self._lock:
+            conn = self._get_conn()
+            try:
+                conn.execute(
+                    """INSERT INTO transcripts (key, text, created_at) VALUES (?, ?, ?)
+                       ON CONFLICT(key) DO UPDATE SET text=excluded.text, created_at=excluded.created_at""",
+                    (key, text, created_at),
+                )
+                conn.execute("DELETE FROM transcripts WHERE created_at < ?", (time.time() - max_age,))
+                conn.execute(
+                    """DELETE FROM transcripts WHERE key NOT IN
+                       (SELECT key FROM transcripts ORDER BY created_at DESC LIMIT ?)""",
+                    (max_rows,),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
     # ── Tasks (NEW) ─────────────────────────────────────────────────────────
 
     async def create_task(self, description: str, steps_total: int = 0, metadata: dict = None) -> int:
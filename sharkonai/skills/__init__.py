@@ -9,8 +9,13 @@ Every skill file must expose:
 
 Optional:
   • SKILL_SETUP(memory) — called once at startup if the skill needs the memory ref
+
+Heavy third-party modules should be pulled in with lazy_import() so that
+loading the skill only registers its definitions; the dependency itself is
+imported the first time one of the skill's tools actually runs.
 """
 
+import functools
 import importlib
 import importlib.util
 import os
@@ -29,11 +34,63 @@ _skills_dir = os.path.dirname(os.path.abspath(__file__))
 _ai_skills_dir = os.path.join(os.path.dirname(_skills_dir), "skills_by_Sharkon")
 _loaded_modules: Dict[str, object] = {}
 _memory_ref = None
+_tools_prompt: Optional[str] = None
 
 # Ensure AI skills directory exists
 os.makedirs(_ai_skills_dir, exist_ok=True)
 
 
+def lazy_import(name: str):
+    """
+    Return a module that is only actually imported on first attribute access.
+    Lets skills keep heavy dependencies (pyautogui -> PIL, pyscreeze, ...) at
+    module scope without paying their import cost until a tool is used.
+    Raises ImportError right away if the module is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    loader.exec_module(mod)
+    return mod
+
+
+@functools.lru_cache(maxsize=None)
+def screen_size():
+    """
+    Primary screen (width, height). Queried once; the resolution is fixed for
+    the session. Lives here so skills that need it don't depend on each other.
+    """
+    import pyautogui
+    w, h = pyautogui.size()
+    return w, h
+
+
+IMG_EXT = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tiff"})
+
+
+def fmt_size(n: int) -> str:
+    """Human-readable byte count: B, KB, MB or GB."""
+    if n < 1024:
+        return f"{n} B"
+    if n < 1 << 20:
+        return f"{n / 1024:.1f} KB"
+    if n < 1 << 30:
+        return f"{n / (1 << 20):.1f} MB"
+    return f"{n / (1 << 30):.1f} GB"
+
+
+def invalidate_tools_prompt():
+    """Drop the cached tools prompt. Call after changing TOOL_DEFINITIONS."""
+    global _tools_prompt
+    _tools_prompt = None
+
+
 def set_memory_ref(memory):
     """Inject the memory reference into skills that need it."""
     global _memory_ref
@@ -89,6 +146,7 @@ def _register_skill(mod, module_name: str):
     for name, func in smap.items():
         TOOL_MAP[name] = func
         count += 1
+    invalidate_tools_prompt()
 
     # If the skill has a SKILL_SETUP and we already have memory, call it
     setup_fn = getattr(mod, "SKILL_SETUP", None)
@@ -110,6 +168,7 @@ def load_all_skills():
     TOOL_DEFINITIONS.clear()
     TOOL_MAP.clear()
     _loaded_modules.clear()
+    invalidate_tools_prompt()
 
     if not os.path.isdir(_skills_dir):
         log.warning(f"Skills directory not found: {_skills_dir}")
@@ -184,6 +243,7 @@ def load_single_skill(filename: str, ai_created: bool = False) -> bool:
             TOOL_MAP.pop(name, None)
         for d in old_defs:
             TOOL_DEFINITIONS[:] = [x for x in TOOL_DEFINITIONS if x.get("name") != d.get("name")]
+        invalidate_tools_prompt()
         # Remove from sys.modules for clean reload
         sys.modules.pop(module_name, None)
 
@@ -202,8 +262,7 @@ def get_loaded_skills() -> List[str]:
     return list(_loaded_modules.keys())
 
 
-def get_tools_prompt() -> str:
-    """Generate a system-prompt-friendly description of all available tools."""
+def _build_tools_prompt() -> str:
     lines = ["Available tools:\n"]
     for tool in TOOL_DEFINITIONS:
         params = ", ".join(
@@ -218,6 +277,17 @@ def get_tools_prompt() -> str:
     return "\n".join(lines)
 
 
+def get_tools_prompt() -> str:
+    """
+    Return a system-prompt-friendly description of all available tools.
+    Built once and reused until a skill is loaded, reloaded or deleted.
+    """
+    global _tools_prompt
+    if _tools_prompt is None:
+        _tools_prompt = _build_tools_prompt()
+    return _tools_prompt
+
+
 def get_skill_summary() -> str:
     """
     Return a compact summary of all loaded skills and their tools.
@@ -4,13 +4,45 @@ Convert voice messages / audio files to text.
 """
 
 import asyncio
+import hashlib
 import os
+import random
 import subprocess
+import tempfile
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from config import CONFIG
 from logger import log
+from skills import lazy_import
 from skills.system_commands import ToolResult
 
+try:
+    import speech_recognition as sr
+except ImportError:  # only the Windows System.Speech fallback is available
+    sr = None
+
+try:
+    av = lazy_import("av")  # libav* shared libraries load on first decode, not at startup
+except ImportError:  # decoding shells out to ffmpeg
+    av = None
+
+try:
+    from pydub import AudioSegment
+except ImportError:  # conversion relies on ffmpeg alone
+    AudioSegment = None
+
+
+_memory_ref = None
+
+
+def SKILL_SETUP(memory):
+    """Receive the memory reference; used to persist the transcript cache."""
+    global _memory_ref
+    _memory_ref = memory
+
 
 SKILL_DEFINITIONS = [
     {
@@ -28,60 +60,192 @@ SKILL_DEFINITIONS = [
 ]
 
 
-def _convert_audio_to_wav(input_path: str) -> str:
-    wav_path = os.path.splitext(input_path)[0] + "_converted.wav"
+# ── Transcript cache ────────────────────────────────────────────────────────
+# Keyed by a BLAKE2b digest of the audio plus the language, so a re-sent voice
+# note skips conversion and the speech API. In-process LRU, backed by the
+# memory transcripts table (same row cap and TTL) so hits survive restarts.
+
+_TRANSCRIPT_CACHE_MAX = 512
+_TRANSCRIPT_CACHE: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_HASH_EDGE = 64 * 1024  # large files: hash size + first/last 64 KiB only
+
+
+def _transcript_ttl() -> float:
+    return getattr(CONFIG, "TRANSCRIPT_CACHE_TTL", 24 * 3600)
+
+
+def _audio_digest(path: str) -> str:
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * _HASH_EDGE:
+            h.update(f.read())
+        else:
+            h.update(f.read(_HASH_EDGE))
+            f.seek(-_HASH_EDGE, os.SEEK_END)
+            h.update(f.read())
+    return h.hexdigest()
+
+
+async def _cached_transcript(key: str):
+    ttl = _transcript_ttl()
+    entry = _TRANSCRIPT_CACHE.get(key)
+    if entry is not None and time.time() - entry[0] >= ttl:
+        _TRANSCRIPT_CACHE.pop(key, None)
+        entry = None
+    if entry is None and _memory_ref is not None:
+        try:
+            entry = await _memory_ref.get_transcript(key, ttl)  # drops the row if expired
+        except Exception as e:
+            log.debug(f"Transcript cache read failed: {e}")
+    if entry is None:
+        return None
+    _TRANSCRIPT_CACHE[key] = entry
+    _TRANSCRIPT_CACHE.move_to_end(key)
+    return entry[1]
+
+
+async def _store_transcript(key: str, text: str):
+    entry = (time.time(), text)
+    _TRANSCRIPT_CACHE[key] = entry
+    _TRANSCRIPT_CACHE.move_to_end(key)
+    while len(_TRANSCRIPT_CACHE) > _TRANSCRIPT_CACHE_MAX:
+        _TRANSCRIPT_CACHE.popitem(last=False)
+    if _memory_ref is not None:
+        try:
+            await _memory_ref.store_transcript(key, text, entry[0], _transcript_ttl(), _TRANSCRIPT_CACHE_MAX)
+        except Exception as e:
+            log.debug(f"Transcript cache write failed: {e}")
+
+
+# Audio is handled in memory as raw 16 kHz mono signed 16-bit PCM
+_PCM_RATE = 16000
+_PCM_WIDTH = 2
+
+
+def _decode_with_pyav(input_path: str) -> bytes:
+    """Decode and resample in-process with PyAV (libav*), no ffmpeg process."""
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=_PCM_RATE)
+    chunks = []
+    with av.open(input_path) as container:
+        if not container.streams.audio:
+            return b""
+        for frame in container.decode(container.streams.audio[0]):
+            for out in resampler.resample(frame):
+                # Packed s16 mono: one plane, possibly padded past the last sample
+                chunks.append(bytes(out.planes[0])[:out.samples * _PCM_WIDTH])
+    for out in resampler.resample(None):
+        chunks.append(bytes(out.planes[0])[:out.samples * _PCM_WIDTH])
+    return b"".join(chunks)
+
+
+def _convert_audio_to_pcm(input_path: str) -> bytes:
+    """Decode any audio file to raw PCM — PyAV in-process, else ffmpeg's stdout. b"" on failure."""
+    if av is not None:
+        try:
+            pcm = _decode_with_pyav(input_path)
+            if pcm:
+                return pcm
+        except Exception as e:
+            log.warning(f"PyAV decode failed, falling back to ffmpeg: {e}")
     try:
         result = subprocess.run(
-            ["ffmpeg", "-y", "-i", input_path, "-ar", "16000", "-ac", "1", "-sample_fmt", "s16", wav_path],
-            capture_output=True, text=True, timeout=30,
+            ["ffmpeg", "-y", "-i", input_path, "-f", "s16le", "-ar", str(_PCM_RATE), "-ac", "1", "-"],
+            capture_output=True, bufsize=1 << 20, timeout=30,
         )
-        if result.returncode == 0 and os.path.exists(wav_path):
-            return wav_path
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+        log.warning(f"ffmpeg failed ({result.returncode}): {result.stderr[-200:].decode('utf-8', 'replace')}")
     except FileNotFoundError:
         pass
     except Exception as e:
         log.warning(f"ffmpeg error: {e}")
+    if AudioSegment is None:
+        return b""
     try:
-        py_convert = (
-            f"import subprocess, sys; "
-            f"subprocess.run([sys.executable, '-m', 'pip', 'install', 'pydub'], capture_output=True); "
-            f"from pydub import AudioSegment; "
-            f"audio = AudioSegment.from_file(r'{input_path}'); "
-            f"audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2); "
-            f"audio.export(r'{wav_path}', format='wav')"
-        )
-        result = subprocess.run(["python", "-c", py_convert], capture_output=True, text=True, timeout=60)
-        if result.returncode == 0 and os.path.exists(wav_path):
-            return wav_path
+        seg = AudioSegment.from_file(input_path)
+        seg = seg.set_frame_rate(_PCM_RATE).set_channels(1).set_sample_width(_PCM_WIDTH)
+        return seg.raw_data
     except Exception as e:
         log.warning(f"Fallback conversion error: {e}")
-    return ""
+    return b""
 
 
-def _transcribe_with_speech_recognition(wav_path: str, language: str = "en-US") -> str:
+def _wav_needs_conversion(w: wave.Wave_read) -> bool:
+    return (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (_PCM_RATE, 1, _PCM_WIDTH)
+
+
+def _read_wav_pcm(path: str) -> bytes:
+    """Frames of a WAV that is already 16 kHz mono s16, read straight from the file. b"" otherwise."""
     try:
-        import speech_recognition as sr
-    except ImportError:
-        subprocess.run(["pip", "install", "SpeechRecognition"], capture_output=True, timeout=60)
-        import speech_recognition as sr
+        with wave.open(path, "rb") as w:
+            if _wav_needs_conversion(w):
+                return b""
+            return w.readframes(w.getnframes())
+    except (wave.Error, EOFError):
+        return b""  # not a plain PCM WAV (or not a WAV at all)
+
+
+# ── Speech API concurrency ──────────────────────────────────────────────────
+# Recognition is ~1-3 s of blocking HTTP per language. It runs on its own pool
+# (not the default executor shared with downloads) and the semaphore bounds
+# how many requests are in flight, so a burst of voice notes can't 429-spiral.
+
+_SPEECH_SEM = asyncio.Semaphore(getattr(CONFIG, "SPEECH_MAX_CONCURRENT", 4) or 4)  # older config.py files lack it
+_SPEECH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stt")
+_SPEECH_RETRIES = 3
+
+
+class _SpeechRequestError(Exception):
+    """sr.RequestError re-raised so the async side can back off and retry."""
+
+
+def _transcribe_with_speech_recognition(pcm: bytes, language: str = "en-US") -> str:
     recognizer = sr.Recognizer()
-    recognizer.energy_threshold = 300
-    recognizer.dynamic_energy_threshold = True
-    with sr.AudioFile(wav_path) as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-        audio_data = recognizer.record(source)
+    audio_data = sr.AudioData(pcm, _PCM_RATE, _PCM_WIDTH)
     try:
         return recognizer.recognize_google(audio_data, language=language)
     except sr.UnknownValueError:
         pass
     except sr.RequestError as e:
-        log.warning(f"Google Speech API error: {e}")
+        raise _SpeechRequestError(str(e)) from e
     return ""
 
 
+async def _recognize(pcm: bytes, language: str) -> str:
+    """Run one recognition on the speech pool, retrying API errors with backoff."""
+    loop = asyncio.get_running_loop()
+    for attempt in range(_SPEECH_RETRIES + 1):
+        try:
+            async with _SPEECH_SEM:
+                return await loop.run_in_executor(
+                    _SPEECH_EXECUTOR, _transcribe_with_speech_recognition, pcm, language
+                )
+        except _SpeechRequestError as e:
+            if attempt == _SPEECH_RETRIES:
+                log.warning(f"Google Speech API error: {e}")
+                break
+            delay = min(30, 2 ** attempt) + random.random()
+            log.warning(f"Google Speech API error: {e} — retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    return ""
+
+
+def _write_temp_wav(pcm: bytes) -> str:
+    """Wrap PCM in a temporary WAV file, for System.Speech which only reads from a path."""
+    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="sharkon_stt_")
+    with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(_PCM_WIDTH)
+        w.setframerate(_PCM_RATE)
+        w.writeframes(pcm)
+    return wav_path
+
+
 def _transcribe_powershell_fallback(wav_path: str) -> str:
     ps_script = f"""
 try {{
+    [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
     Add-Type -AssemblyName System.Speech
     $recognizer = New-Object System.Speech.Recognition.SpeechRecognitionEngine
     $recognizer.SetInputToWaveFile("{wav_path.replace(chr(92), chr(92)*2)}")
@@ -95,10 +259,10 @@ try {{
     try:
         proc = subprocess.run(
             ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', ps_script],
-            capture_output=True, text=True, timeout=30,
+            capture_output=True, bufsize=1 << 20, timeout=30,
         )
         if proc.returncode == 0 and proc.stdout.strip():
-            return proc.stdout.strip()
+            return proc.stdout.decode("utf-8", "replace").strip()
     except Exception:
         pass
     return ""
@@ -108,14 +272,19 @@ async def transcribe_audio(audio_path: str, language: str = "auto") -> ToolResul
     log.info(f"Transcribing audio: {audio_path} (language: {language})")
     if not os.path.exists(audio_path):
         return ToolResult(success=False, stdout="", stderr=f"Audio file not found: {audio_path}", return_code=1)
-    loop = asyncio.get_event_loop()
+    cache_key = f"{await asyncio.to_thread(_audio_digest, audio_path)}:{language}"
+    cached = await _cached_transcript(cache_key)
+    if cached is not None:
+        log.info("Transcript cache hit")
+        return ToolResult(success=True, stdout=cached, stderr="", return_code=0)
     ext = os.path.splitext(audio_path)[1].lower()
-    if ext == ".wav":
-        wav_path = audio_path
-    else:
-        wav_path = await loop.run_in_executor(None, _convert_audio_to_wav, audio_path)
-        if not wav_path:
-            return ToolResult(success=False, stdout="", stderr=f"Failed to convert {ext} to WAV.", return_code=1)
+    # Only a WAV header probe when the file already matches the target format
+    pcm = await asyncio.to_thread(_read_wav_pcm, audio_path)
+    if not pcm:
+        pcm = await asyncio.to_thread(_convert_audio_to_pcm, audio_path)
+        if not pcm:
+            return ToolResult(success=False, stdout="", stderr=f"Failed to convert {ext} to PCM audio.", return_code=1)
+    wav_path = ""
     try:
         if language == "auto":
             languages_to_try = list(CONFIG.VOICE_LANGUAGES)
@@ -123,8 +292,8 @@ async def transcribe_audio(audio_path: str, language: str = "auto") -> ToolResul
             languages_to_try = [language]
         best_text = ""
         best_lang = ""
-        for lang in languages_to_try:
-            text = await loop.run_in_executor(None, _transcribe_with_speech_recognition, wav_path, lang)
+        for lang in (languages_to_try if sr is not None else ()):
+            text = await _recognize(pcm, lang)
             if text and len(text.strip()) > 0:
                 words = text.lower().split()
                 unique_words = set(words)
@@ -137,17 +306,22 @@ async def transcribe_audio(audio_path: str, language: str = "auto") -> ToolResul
                     best_text = text
                     best_lang = lang
         if not best_text:
-            text = await loop.run_in_executor(None, _transcribe_powershell_fallback, wav_path)
+            wav_path = await asyncio.to_thread(_write_temp_wav, pcm)
+            text = await asyncio.to_thread(_transcribe_powershell_fallback, wav_path)
             if text:
                 best_text = text
                 best_lang = "en-US (Windows)"
         if best_text:
             lang_info = f" [{best_lang}]" if best_lang else ""
-            return ToolResult(success=True, stdout=f"🎤 Transcription{lang_info}:\n{best_text}", stderr="", return_code=0)
+            output = f"🎤 Transcription{lang_info}:\n{best_text}"
+            await _store_transcript(cache_key, output)
+            return ToolResult(success=True, stdout=output, stderr="", return_code=0)
+        if sr is None:
+            return ToolResult(success=False, stdout="", stderr="Could not transcribe. SpeechRecognition is not installed: pip install SpeechRecognition", return_code=1)
         tried = ", ".join(languages_to_try)
         return ToolResult(success=False, stdout="", stderr=f"Could not transcribe. Tried: {tried}", return_code=1)
     finally:
-        if wav_path != audio_path:
+        if wav_path:
             try:
                 os.remove(wav_path)
             except OSError:
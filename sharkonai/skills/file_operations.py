@@ -3,11 +3,24 @@ Skill: File Operations
 Read, write, append, list, find, create, and send files.
 """
 
+import asyncio
+import functools
+import glob
+import itertools
+import mmap
 import os
+import re
+from datetime import datetime
 
 from config import CONFIG
 from logger import log
-from skills.system_commands import ToolResult, execute_cmd
+from skills import IMG_EXT, fmt_size
+from skills.system_commands import ToolResult
+
+try:
+    from fpdf import FPDF
+except ImportError:  # create_pdf reports the missing dependency
+    FPDF = None
 
 
 # ── Definitions ─────────────────────────────────────────────────────────────
@@ -168,6 +181,10 @@ SKILL_DEFINITIONS = [
                 "type": "string",
                 "description": "Glob pattern to match files (e.g., '*.py', '**/*.log').",
             },
+            "max_results": {
+                "type": "integer",
+                "description": "Maximum number of paths to return (default 100).",
+            },
         },
     },
     {
@@ -193,21 +210,52 @@ SKILL_DEFINITIONS = [
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
+_TRUNC_FILE = "\n... [file truncated]"
+_MMAP_THRESHOLD = 64 * 1024  # below this, plain readlines() is cheaper than mmap setup
+# Same line breaks as text-mode universal newlines, so both read paths count lines alike
+_LINE_BREAK = re.compile(rb"\r\n?|\n")
+
+
+def _line_offset(mm: mmap.mmap, lines: int, pos: int) -> int:
+    """Return the byte offset just past the `lines`-th line break at or after pos."""
+    if lines <= 0:
+        return pos
+    for i, m in enumerate(_LINE_BREAK.finditer(mm, pos), 1):
+        if i == lines:
+            return m.end()
+    return len(mm)
+
+
+def _read_lines_mmap(path: str, start_line: int = None, end_line: int = None) -> str:
+    """Read a line range of a large file through mmap, decoding only that range."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        s = max((start_line or 1) - 1, 0)
+        a = _line_offset(mm, s, 0)
+        b = _line_offset(mm, end_line - s, a) if end_line else len(mm)
+        data = mm[a:b]
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _sync_read(path: str, start_line: int = None, end_line: int = None) -> str:
+    """Blocking part of read_file; run via asyncio.to_thread."""
+    ranged = start_line is not None or end_line is not None
+    if ranged and os.path.getsize(path) >= _MMAP_THRESHOLD:
+        return _read_lines_mmap(path, start_line, end_line)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        if ranged:
+            s = max((start_line or 1) - 1, 0)
+            return "".join(itertools.islice(f, s, end_line or None))
+        return f.read()
+
+
 async def read_file_tool(path: str, start_line: int = None, end_line: int = None) -> ToolResult:
     """Read file contents, optionally a specific line range."""
     log.info(f"Reading file: {path}")
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            if start_line is not None or end_line is not None:
-                lines = f.readlines()
-                s = (start_line or 1) - 1
-                e = end_line or len(lines)
-                content = "".join(lines[s:e])
-            else:
-                content = f.read()
-        max_len = 10000
-        if len(content) > max_len:
-            content = content[:max_len] + "\n... [file truncated]"
+        content = await asyncio.to_thread(_sync_read, path, start_line, end_line)
+        max_chars = getattr(CONFIG, "MAX_FILE_READ_CHARS", 10000)  # older config.py files lack it
+        if len(content) > max_chars:
+            content = content[:max_chars] + _TRUNC_FILE
         return ToolResult(success=True, stdout=content, stderr="", return_code=0)
     except Exception as e:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -220,6 +268,40 @@ _BLOCKED_WRITE_DIRS = {
 }
 
 
+# Parent directories already created/verified by write_file/append_file
+_DIRS_ENSURED: set = set()
+
+
+def _open_for_write(path: str, mode: str):
+    """Open path for writing, creating its parent directory only when needed."""
+    d = os.path.dirname(path)
+    if d and d not in _DIRS_ENSURED:
+        os.makedirs(d, exist_ok=True)
+        _DIRS_ENSURED.add(d)
+    try:
+        return open(path, mode, encoding="utf-8")
+    except FileNotFoundError:
+        if not d or d not in _DIRS_ENSURED:
+            raise
+        # Directory was removed since we cached it — recreate once
+        _DIRS_ENSURED.discard(d)
+        os.makedirs(d, exist_ok=True)
+        _DIRS_ENSURED.add(d)
+        return open(path, mode, encoding="utf-8")
+
+
+def _sync_write(path: str, content: str):
+    """Blocking part of write_file; run via asyncio.to_thread."""
+    with _open_for_write(path, "w") as f:
+        f.write(content)
+
+
+def _sync_append(path: str, content: str):
+    """Blocking part of append_file; run via asyncio.to_thread."""
+    with _open_for_write(path, "a") as f:
+        f.write(content)
+
+
 async def write_file_tool(path: str, content: str) -> ToolResult:
     """Write content to a file."""
     log.info(f"Writing file: {path}")
@@ -236,9 +318,7 @@ async def write_file_tool(path: str, content: str) -> ToolResult:
                     ),
                     return_code=1,
                 )
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        await asyncio.to_thread(_sync_write, path, content)
         return ToolResult(
             success=True,
             stdout=f"Successfully wrote {len(content)} characters to {path}",
@@ -252,9 +332,7 @@ async def append_file(path: str, content: str) -> ToolResult:
     """Append content to a file."""
     log.info(f"Appending to file: {path}")
     try:
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(content)
+        await asyncio.to_thread(_sync_append, path, content)
         return ToolResult(
             success=True,
             stdout=f"Appended {len(content)} characters to {path}",
@@ -264,29 +342,33 @@ async def append_file(path: str, content: str) -> ToolResult:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
+_DIR_COUNT_CAP = 1000  # stop counting a subfolder's items past this
+
+
+def _sync_list_directory(path: str) -> list:
+    """Blocking part of list_directory; uses DirEntry's cached stat info."""
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    result_lines = []
+    for entry in entries:
+        if entry.is_dir():
+            try:
+                with os.scandir(entry.path) as sub:
+                    count = sum(1 for _ in itertools.islice(sub, _DIR_COUNT_CAP))
+                count_str = f"{count}+" if count == _DIR_COUNT_CAP else str(count)
+                result_lines.append(f"[DIR]  {entry.name}/ ({count_str} items)")
+            except PermissionError:
+                result_lines.append(f"[DIR]  {entry.name}/ (access denied)")
+        else:
+            result_lines.append(f"[FILE] {entry.name} ({fmt_size(entry.stat().st_size)})")
+    return result_lines
+
+
 async def list_directory(path: str = ".") -> ToolResult:
     """List directory contents with details."""
     log.info(f"Listing directory: {path}")
     try:
-        entries = os.listdir(path)
-        result_lines = []
-        for entry in sorted(entries):
-            full = os.path.join(path, entry)
-            if os.path.isdir(full):
-                try:
-                    count = len(os.listdir(full))
-                    result_lines.append(f"[DIR]  {entry}/ ({count} items)")
-                except PermissionError:
-                    result_lines.append(f"[DIR]  {entry}/ (access denied)")
-            else:
-                size = os.path.getsize(full)
-                if size < 1024:
-                    size_str = f"{size} B"
-                elif size < 1024 * 1024:
-                    size_str = f"{size / 1024:.1f} KB"
-                else:
-                    size_str = f"{size / (1024 * 1024):.1f} MB"
-                result_lines.append(f"[FILE] {entry} ({size_str})")
+        result_lines = await asyncio.to_thread(_sync_list_directory, path)
         return ToolResult(
             success=True,
             stdout="\n".join(result_lines) if result_lines else "(empty directory)",
@@ -296,16 +378,27 @@ async def list_directory(path: str = ".") -> ToolResult:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
-async def find_files(directory: str, pattern: str) -> ToolResult:
+async def find_files(directory: str, pattern: str, max_results: int = 100) -> ToolResult:
     """Search for files matching a glob pattern recursively."""
     log.info(f"Finding files: {pattern} in {directory}")
     try:
-        import glob
-        matches = glob.glob(os.path.join(directory, pattern), recursive=True)
+        if not os.path.isdir(directory):
+            return ToolResult(success=False, stdout="", stderr=f"Directory not found: {directory}", return_code=1)
+        try:
+            max_results = max(1, int(max_results))
+        except (TypeError, ValueError):
+            return ToolResult(success=False, stdout="", stderr=f"max_results must be an integer, got {max_results!r}", return_code=1)
+        # iglob walks lazily, so one extra match tells us whether there are more
+        # without walking the rest of the tree (same semantics as glob.glob)
+        matches = await asyncio.to_thread(
+            lambda: list(itertools.islice(
+                glob.iglob(os.path.join(directory, pattern), recursive=True), max_results + 1
+            ))
+        )
         if matches:
-            result = "\n".join(matches[:100])
-            if len(matches) > 100:
-                result += f"\n... and {len(matches) - 100} more"
+            result = "\n".join(matches[:max_results])
+            if len(matches) > max_results:
+                result += f"\n... and more (showing the first {max_results}; narrow the pattern or directory)"
             return ToolResult(success=True, stdout=result, stderr="", return_code=0)
         else:
             return ToolResult(success=True, stdout="No files found matching the pattern.", stderr="", return_code=0)
@@ -319,10 +412,13 @@ async def create_file_tool(filename: str, content: str, caption: str = "") -> To
     try:
         filepath = os.path.join(CONFIG.MEDIA_DIR, filename)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
-        size = os.path.getsize(filepath)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+        # Encode once and hand the whole buffer to a single write() instead of
+        # trickling it through the 8 KiB text-mode buffer
+        data = content.encode("utf-8")
+        with open(filepath, "wb") as f:
+            f.write(data)
+        size = len(data)
+        size_str = fmt_size(size)
         return ToolResult(
             success=True,
             stdout=f"✅ File created: {filename} ({size_str})",
@@ -334,31 +430,35 @@ async def create_file_tool(filename: str, content: str, caption: str = "") -> To
         return ToolResult(success=False, stdout="", stderr=f"Failed to create file: {e}", return_code=1)
 
 
+@functools.lru_cache(maxsize=1)
+def _pdf_font_paths():
+    """(regular, bold) Arial TTF paths, or None when the system fonts are missing. Resolved once."""
+    font_dir = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")
+    regular = os.path.join(font_dir, "arial.ttf")
+    bold = os.path.join(font_dir, "arialbd.ttf")
+    if os.path.exists(regular) and os.path.exists(bold):
+        return regular, bold
+    return None
+
+
 async def create_pdf(filename: str, title: str, content: str, caption: str = "") -> ToolResult:
     """Create a PDF document with title and content."""
     log.info(f"Creating PDF: {filename}")
     if not filename.lower().endswith(".pdf"):
         filename += ".pdf"
+    if FPDF is None:
+        return ToolResult(success=False, stdout="", stderr="fpdf2 is not installed: pip install fpdf2", return_code=1)
     filepath = os.path.join(CONFIG.MEDIA_DIR, filename)
     try:
-        try:
-            from fpdf import FPDF
-        except ImportError:
-            log.info("fpdf2 not found, installing...")
-            install_result = await execute_cmd("pip install fpdf2")
-            if not install_result.success:
-                return ToolResult(success=False, stdout="", stderr=f"Failed to install fpdf2: {install_result.stderr}", return_code=1)
-            from fpdf import FPDF
-
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=20)
         pdf.add_page()
 
-        font_dir = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")
-        arial_path = os.path.join(font_dir, "arial.ttf")
-        if os.path.exists(arial_path):
-            pdf.add_font("ArialUni", "", arial_path, uni=True)
-            pdf.add_font("ArialUni", "B", os.path.join(font_dir, "arialbd.ttf"), uni=True)
+        fonts = _pdf_font_paths()
+        if fonts:
+            # fpdf2 fonts are always Unicode; the old uni=True only triggers a deprecation warning
+            pdf.add_font("ArialUni", "", fonts[0])
+            pdf.add_font("ArialUni", "B", fonts[1])
             title_font = "ArialUni"
             body_font = "ArialUni"
         else:
@@ -372,28 +472,36 @@ async def create_pdf(filename: str, title: str, content: str, caption: str = "")
         pdf.line(15, pdf.get_y(), 195, pdf.get_y())
         pdf.ln(6)
 
+        # Only switch fonts when the line kind changes; runs of body lines
+        # share one set_font
+        heading_font = (title_font, "B", 14)
+        text_font = (body_font, "", 11)
+        current_font = None
         for line in content.split("\n"):
-            if line.startswith("## "):
+            text = line.strip()
+            if not text:
                 pdf.ln(4)
-                pdf.set_font(title_font, "B", 14)
-                pdf.cell(0, 8, line[3:].strip(), ln=True)
-                pdf.ln(2)
-            elif line.strip() == "":
+                continue
+            font = heading_font if line.startswith("## ") else text_font
+            if font is not current_font:
+                pdf.set_font(*font)
+                current_font = font
+            if font is heading_font:
                 pdf.ln(4)
+                pdf.cell(0, 8, text[3:].strip(), ln=True)
+                pdf.ln(2)
             else:
-                pdf.set_font(body_font, "", 11)
-                pdf.multi_cell(0, 6, line.strip())
+                pdf.multi_cell(0, 6, text)
                 pdf.ln(1)
 
         pdf.ln(10)
         pdf.set_font(body_font, "", 8)
         pdf.set_text_color(150, 150, 150)
-        from datetime import datetime
         pdf.cell(0, 5, f"Generated by SharkonAI — {datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=True, align="C")
         pdf.output(filepath)
 
         size = os.path.getsize(filepath)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+        size_str = fmt_size(size)
         return ToolResult(success=True, stdout=f"✅ PDF created: {filename} ({size_str})", stderr="", return_code=0, file_path=filepath)
     except Exception as e:
         log.error(f"create_pdf error: {e}")
@@ -404,29 +512,42 @@ async def send_file_tool(path: str, caption: str = "") -> ToolResult:
     """Send any file to the user as a Telegram document."""
     log.info(f"Sending file: {path}")
     try:
-        if not os.path.exists(path):
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
             return ToolResult(success=False, stdout="", stderr=f"File not found: {path}", return_code=1)
-        size = os.path.getsize(path)
         if size > 50 * 1024 * 1024:
             return ToolResult(success=False, stdout="", stderr=f"File too large ({size / (1024*1024):.1f} MB). Telegram limit is 50 MB.", return_code=1)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+        size_str = fmt_size(size)
         return ToolResult(success=True, stdout=f"Sending file: {os.path.basename(path)} ({size_str})", stderr="", return_code=0, file_path=path)
     except Exception as e:
         log.error(f"send_file error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
+def _probe_image(path: str) -> tuple:
+    """(width, height) from the image header."""
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+
 async def send_image(path: str, caption: str = "") -> ToolResult:
     """Send an image file to the user."""
     log.info(f"Sending image: {path}")
     try:
-        if not os.path.exists(path):
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
             return ToolResult(success=False, stdout="", stderr=f"Image file not found: {path}", return_code=1)
-        valid_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff')
-        if not path.lower().endswith(valid_extensions):
-            return ToolResult(success=False, stdout="", stderr=f"Not a supported image format. Supported: {', '.join(valid_extensions)}", return_code=1)
-        size = os.path.getsize(path)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+        if os.path.splitext(path)[1].lower() not in IMG_EXT:
+            return ToolResult(success=False, stdout="", stderr=f"Not a supported image format. Supported: {', '.join(sorted(IMG_EXT))}", return_code=1)
+        size_str = fmt_size(size)
+        try:
+            width, height = await asyncio.to_thread(_probe_image, path)
+            size_str = f"{width}x{height}, {size_str}"
+        except Exception as e:
+            log.debug(f"Could not read image dimensions for {path}: {e}")
         return ToolResult(success=True, stdout=f"Sending image: {os.path.basename(path)} ({size_str})", stderr="", return_code=0, image_path=path)
     except Exception as e:
         log.error(f"send_image error: {e}")
@@ -4,15 +4,18 @@ Keyboard, mouse, drag & drop, hover, select, scroll operations.
 """
 
 import asyncio
+import ctypes
 import time
 import os
 
-import pyautogui
-
 from logger import log
+from skills import lazy_import, screen_size
 from skills.system_commands import ToolResult
 
-# PyAutoGUI safety settings
+pyautogui = lazy_import("pyautogui")
+pyperclip = lazy_import("pyperclip")
+
+# PyAutoGUI safety settings (applied once the module is actually loaded)
 pyautogui.FAILSAFE = True
 pyautogui.PAUSE = 0.1
 
@@ -177,22 +180,121 @@ SKILL_DEFINITIONS = [
             "y": {"type": "integer", "description": "Y coordinate."},
         },
     },
+    {
+        "name": "gui_batch",
+        "description": (
+            "Run a fixed sequence of GUI steps in ONE call, back-to-back without the usual pause "
+            "between actions. Much faster than separate calls for things like click → type → enter. "
+            "Step kinds: 'click', 'type', 'press', 'hotkey', 'move', 'scroll', 'wait'. "
+            "Stops at the first failing step."
+        ),
+        "parameters": {
+            "ops": {
+                "type": "array",
+                "description": (
+                    "List of steps, each an object with 'kind' plus the same parameters as the single tool, e.g. "
+                    "[{\"kind\": \"click\", \"x\": 100, \"y\": 200}, {\"kind\": \"type\", \"text\": \"hello\"}, "
+                    "{\"kind\": \"press\", \"key\": \"enter\"}, {\"kind\": \"wait\", \"seconds\": 0.5}]."
+                ),
+            },
+        },
+    },
 ]
 
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
+# Primitive GUI ops: blocking, each returns a human-readable summary.
+# Single tools and gui_batch share these so there's one implementation path.
+# _pause is forwarded to PyAutoGUI per call, so a batch can skip PAUSE without
+# touching the global other worker threads rely on.
+
+def _op_type(text: str, interval: float = 0.03, _pause: bool = True) -> str:
+    # str.isascii() is O(1) in CPython (it reads the string's compact-ASCII flag),
+    # and typewrite() silently drops keys it doesn't map instead of raising, so an
+    # optimistic try/except would type partial text rather than fall back.
+    if text.isascii():
+        pyautogui.typewrite(text, interval=interval, _pause=_pause)
+    else:
+        pyperclip.copy(text)
+        pyautogui.hotkey("ctrl", "v", _pause=_pause)
+        time.sleep(0.1)
+    return f"Typed {len(text)} characters."
+
+
+def _op_press(key: str, presses: int = 1, _pause: bool = True) -> str:
+    pyautogui.press(key, presses=presses, interval=0.05, _pause=_pause)
+    return f"Pressed '{key}' {presses} time(s)."
+
+
+def _op_hotkey(keys: list, _pause: bool = True) -> str:
+    pyautogui.hotkey(*keys, _pause=_pause)
+    return f"Pressed hotkey: {'+'.join(keys)}"
+
+
+def _op_click(x: int, y: int, button: str = "left", clicks: int = 1, _pause: bool = True) -> str:
+    pyautogui.click(x=x, y=y, button=button, clicks=clicks, interval=0.1, _pause=_pause)
+    return f"Clicked ({x}, {y}) with {button} ({clicks}x)."
+
+
+def _op_move(x: int, y: int, duration: float = 0.3, _pause: bool = True) -> str:
+    pyautogui.moveTo(x, y, duration=duration, _pause=_pause)
+    return f"Moved mouse to ({x}, {y})."
+
+
+def _op_scroll(clicks: int, x: int = None, y: int = None, _pause: bool = True) -> str:
+    pos_str = f"at ({x}, {y})" if x is not None and y is not None else "at current position"
+    if x is not None and y is not None:
+        pyautogui.scroll(clicks, x=x, y=y, _pause=_pause)
+    else:
+        pyautogui.scroll(clicks, _pause=_pause)
+    direction = "up" if clicks > 0 else "down"
+    return f"Scrolled {direction} by {abs(clicks)} clicks {pos_str}."
+
+
+def _op_wait(seconds: float, _pause: bool = True) -> str:
+    seconds = min(seconds, 10)
+    time.sleep(seconds)
+    return f"Waited {seconds}s."
+
+
+_GUI_OPS = {
+    "type": _op_type,
+    "press": _op_press,
+    "hotkey": _op_hotkey,
+    "click": _op_click,
+    "move": _op_move,
+    "scroll": _op_scroll,
+    "wait": _op_wait,
+}
+
+
+def _run_gui_batch(ops: list) -> tuple:
+    """
+    Run GUI ops back-to-back in the calling (worker) thread, skipping
+    PyAutoGUI's per-call PAUSE for each op.
+    Returns (completed_summaries, error_or_None).
+    """
+    done = []
+    for i, op in enumerate(ops, 1):
+        kind = op.get("kind", "")
+        fn = _GUI_OPS.get(kind)
+        if fn is None:
+            return done, f"Step {i}: unknown kind '{kind}'. Use one of: {', '.join(_GUI_OPS)}"
+        params = {k: v for k, v in op.items() if k != "kind" and v is not None}
+        params["_pause"] = False
+        try:
+            done.append(fn(**params))
+        except Exception as e:
+            return done, f"Step {i} ({kind}) failed: {e}"
+    return done, None
+
+
 async def type_text(text: str, interval: float = 0.03) -> ToolResult:
     log.info(f"Typing text: {text[:80]}...")
     try:
-        if text.isascii():
-            pyautogui.typewrite(text, interval=interval)
-        else:
-            import pyperclip
-            pyperclip.copy(text)
-            pyautogui.hotkey("ctrl", "v")
-            time.sleep(0.1)
-        return ToolResult(success=True, stdout=f"Typed {len(text)} characters.", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_type, text, interval)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"type_text error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -201,8 +303,8 @@ async def type_text(text: str, interval: float = 0.03) -> ToolResult:
 async def press_key(key: str, presses: int = 1) -> ToolResult:
     log.info(f"Pressing key: {key} (x{presses})")
     try:
-        pyautogui.press(key, presses=presses, interval=0.05)
-        return ToolResult(success=True, stdout=f"Pressed '{key}' {presses} time(s).", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_press, key, presses)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"press_key error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -211,8 +313,8 @@ async def press_key(key: str, presses: int = 1) -> ToolResult:
 async def hotkey(keys: list) -> ToolResult:
     log.info(f"Pressing hotkey: {'+'.join(keys)}")
     try:
-        pyautogui.hotkey(*keys)
-        return ToolResult(success=True, stdout=f"Pressed hotkey: {'+'.join(keys)}", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_hotkey, keys)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"hotkey error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -221,8 +323,8 @@ async def hotkey(keys: list) -> ToolResult:
 async def mouse_click(x: int, y: int, button: str = "left", clicks: int = 1) -> ToolResult:
     log.info(f"Mouse click: ({x}, {y}) button={button} clicks={clicks}")
     try:
-        pyautogui.click(x=x, y=y, button=button, clicks=clicks, interval=0.1)
-        return ToolResult(success=True, stdout=f"Clicked ({x}, {y}) with {button} ({clicks}x).", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_click, x, y, button, clicks)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"mouse_click error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -231,8 +333,8 @@ async def mouse_click(x: int, y: int, button: str = "left", clicks: int = 1) ->
 async def mouse_move(x: int, y: int, duration: float = 0.3) -> ToolResult:
     log.info(f"Mouse move to: ({x}, {y})")
     try:
-        pyautogui.moveTo(x, y, duration=duration)
-        return ToolResult(success=True, stdout=f"Moved mouse to ({x}, {y}).", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_move, x, y, duration)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"mouse_move error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -242,43 +344,48 @@ async def mouse_scroll(clicks: int, x: int = None, y: int = None) -> ToolResult:
     pos_str = f"at ({x}, {y})" if x is not None and y is not None else "at current position"
     log.info(f"Mouse scroll: {clicks} clicks {pos_str}")
     try:
-        if x is not None and y is not None:
-            pyautogui.scroll(clicks, x=x, y=y)
-        else:
-            pyautogui.scroll(clicks)
-        direction = "up" if clicks > 0 else "down"
-        return ToolResult(success=True, stdout=f"Scrolled {direction} by {abs(clicks)} clicks {pos_str}.", stderr="", return_code=0)
+        msg = await asyncio.to_thread(_op_scroll, clicks, x, y)
+        return ToolResult(success=True, stdout=msg, stderr="", return_code=0)
     except Exception as e:
         log.error(f"mouse_scroll error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
+async def gui_batch(ops: list) -> ToolResult:
+    if not isinstance(ops, list) or not all(isinstance(op, dict) for op in ops):
+        return ToolResult(success=False, stdout="", stderr="'ops' must be a list of objects with a 'kind' key.", return_code=1)
+    log.info(f"GUI batch: {len(ops)} ops")
+    try:
+        done, error = await asyncio.to_thread(_run_gui_batch, ops)
+    except Exception as e:
+        log.error(f"gui_batch error: {e}")
+        return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
+    summary = "\n".join(f"  {i}. {msg}" for i, msg in enumerate(done, 1))
+    if error:
+        log.error(f"gui_batch error: {error}")
+        stdout = f"Completed {len(done)}/{len(ops)} ops:\n{summary}" if done else ""
+        return ToolResult(success=False, stdout=stdout, stderr=error, return_code=1)
+    return ToolResult(success=True, stdout=f"✅ Ran {len(done)} GUI ops:\n{summary}", stderr="", return_code=0)
+
+
+def _sync_drag(start_x: int, start_y: int, end_x: int, end_y: int,
+               duration: float, button: str):
+    """Press, ease-in-out move, release — blocking; run via asyncio.to_thread."""
+    pyautogui.moveTo(start_x, start_y, duration=0.15)
+    pyautogui.mouseDown(button=button)
+    try:
+        pyautogui.moveTo(end_x, end_y, duration=duration, tween=pyautogui.easeInOutQuad)
+    finally:
+        pyautogui.mouseUp(button=button)
+
+
 async def drag_and_drop(start_x: int, start_y: int, end_x: int, end_y: int,
                         duration: float = 0.5, button: str = "left") -> ToolResult:
     log.info(f"Drag & drop: ({start_x},{start_y}) → ({end_x},{end_y})")
     try:
-        pyautogui.moveTo(start_x, start_y, duration=0.15)
-        time.sleep(0.1)
-        rel_x = end_x - start_x
-        rel_y = end_y - start_y
-        pyautogui.mouseDown(button=button)
-        time.sleep(0.05)
-        steps = max(int(duration * 60), 10)
-        for i in range(1, steps + 1):
-            t = i / steps
-            t_smooth = t * t * (3 - 2 * t)
-            ix = int(start_x + rel_x * t_smooth)
-            iy = int(start_y + rel_y * t_smooth)
-            pyautogui.moveTo(ix, iy, _pause=False)
-            time.sleep(duration / steps)
-        time.sleep(0.05)
-        pyautogui.mouseUp(button=button)
+        await asyncio.to_thread(_sync_drag, start_x, start_y, end_x, end_y, duration, button)
         return ToolResult(success=True, stdout=f"✅ Dragged from ({start_x},{start_y}) to ({end_x},{end_y}).", stderr="", return_code=0)
     except Exception as e:
-        try:
-            pyautogui.mouseUp(button=button)
-        except Exception:
-            pass
         log.error(f"drag_and_drop error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
@@ -315,11 +422,11 @@ async def select_text(mode: str = "all", start_x: int = None, start_y: int = Non
             if None in (start_x, start_y, end_x, end_y):
                 return ToolResult(success=False, stdout="", stderr="'range' mode requires start_x/y, end_x/y.", return_code=1)
             pyautogui.click(x=start_x, y=start_y)
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
             pyautogui.keyDown('shift')
-            time.sleep(0.05)
+            await asyncio.sleep(0.05)
             pyautogui.click(x=end_x, y=end_y)
-            time.sleep(0.05)
+            await asyncio.sleep(0.05)
             pyautogui.keyUp('shift')
             return ToolResult(success=True, stdout=f"✅ Selected range ({start_x},{start_y}) to ({end_x},{end_y}).", stderr="", return_code=0)
         else:
@@ -360,7 +467,6 @@ async def scroll_smooth(direction: str = "down", amount: int = 5, steps: int = 1
                 await asyncio.sleep(0.03)
         elif direction in ("left", "right"):
             try:
-                import ctypes
                 user32 = ctypes.windll.user32
                 hwnd = user32.GetForegroundWindow()
                 WM_HSCROLL = 0x0114
@@ -370,7 +476,7 @@ async def scroll_smooth(direction: str = "down", amount: int = 5, steps: int = 1
                     await asyncio.sleep(0.03)
             except Exception:
                 pyautogui.keyDown('shift')
-                time.sleep(0.05)
+                await asyncio.sleep(0.05)
                 pyautogui.scroll(-amount if direction == "left" else amount)
                 pyautogui.keyUp('shift')
         else:
@@ -416,7 +522,7 @@ async def get_mouse_position() -> ToolResult:
             color_str = f"RGB({pixel[0]}, {pixel[1]}, {pixel[2]}) / #{pixel[0]:02x}{pixel[1]:02x}{pixel[2]:02x}"
         except Exception:
             color_str = "(could not read pixel color)"
-        screen_w, screen_h = pyautogui.size()
+        screen_w, screen_h = screen_size()
         return ToolResult(
             success=True,
             stdout=(
@@ -459,4 +565,5 @@ SKILL_MAP = {
     "mouse_hold": mouse_hold,
     "get_mouse_position": get_mouse_position,
     "right_click_at": right_click_at,
+    "gui_batch": gui_batch,
 }
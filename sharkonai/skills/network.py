@@ -5,10 +5,12 @@ HTTP requests, file downloads.
 
 import asyncio
 import os
-import urllib.request
+
+import aiohttp
 
 from config import CONFIG
 from logger import log
+from skills import IMG_EXT, fmt_size
 from skills.system_commands import ToolResult
 
 
@@ -36,19 +38,27 @@ SKILL_DEFINITIONS = [
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
+_DOWNLOAD_CHUNK = 1 << 20  # 1 MiB per read / write
+
 async def http_request(url: str, headers: dict = None) -> ToolResult:
     log.info(f"HTTP request: {url}")
     try:
-        req = urllib.request.Request(url)
-        req.add_header("User-Agent", "SharkonAI/1.0")
+        req_headers = {"User-Agent": "SharkonAI/1.0"}
         if headers:
-            for k, v in headers.items():
-                req.add_header(k, v)
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: urllib.request.urlopen(req, timeout=30))
-        body = response.read().decode("utf-8", errors="replace")
+            req_headers.update(headers)
         max_len = 10000
-        if len(body) > max_len:
+        # Worst case 4 bytes per UTF-8 char: more than this many bytes is always over max_len
+        read_limit = max_len * 4 + 1
+        async with aiohttp.ClientSession(headers=req_headers) as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                response.raise_for_status()
+                try:
+                    data = await response.content.readexactly(read_limit)
+                    cut = True  # stop here; the rest of the body is never downloaded
+                except asyncio.IncompleteReadError as e:
+                    data, cut = e.partial, False
+        body = data.decode("utf-8", errors="replace")
+        if cut or len(body) > max_len:
             body = body[:max_len] + "\n... [response truncated]"
         result = f"Status: {response.status}\nURL: {url}\n\n{body}"
         return ToolResult(success=True, stdout=result, stderr="", return_code=0)
@@ -65,14 +75,17 @@ async def download_file(url: str, save_path: str = "") -> ToolResult:
     log.info(f"Downloading: {url} -> {save_path}")
     try:
         os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
-        loop = asyncio.get_event_loop()
-        def _download():
-            urllib.request.urlretrieve(url, save_path)
-            return os.path.getsize(save_path)
-        size = await loop.run_in_executor(None, _download)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
-        image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff')
-        img_path = save_path if save_path.lower().endswith(image_extensions) else ""
+        size = 0
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        async with aiohttp.ClientSession(headers={"User-Agent": "SharkonAI/1.0"}) as session:
+            async with session.get(url, timeout=timeout) as resp:
+                resp.raise_for_status()
+                with open(save_path, "wb", buffering=_DOWNLOAD_CHUNK) as f:
+                    async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK):
+                        await asyncio.to_thread(f.write, chunk)
+                        size += len(chunk)
+        size_str = fmt_size(size)
+        img_path = save_path if os.path.splitext(save_path)[1].lower() in IMG_EXT else ""
         return ToolResult(success=True, stdout=f"Downloaded {size_str} to {save_path}", stderr="", return_code=0, image_path=img_path)
     except Exception as e:
         return ToolResult(success=False, stdout="", stderr=f"Download error: {e}", return_code=1)
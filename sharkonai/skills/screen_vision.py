@@ -4,57 +4,129 @@ Analyze screen content, click text, find text, drag by text, hover by text.
 """
 
 import asyncio
+import base64
+import ctypes
 import os
+import shutil
 import subprocess
+import tempfile
+import threading
 import time
 
-import pyautogui
-
 from config import CONFIG
 from logger import log
-from skills.system_commands import ToolResult
+from skills import lazy_import, screen_size
+from skills.system_commands import ToolResult, execute_cmd
+
+pyautogui = lazy_import("pyautogui")
+
+try:
+    psutil = lazy_import("psutil")
+except ImportError:  # process names come from kernel32 instead
+    psutil = None
+
+try:
+    mss = lazy_import("mss")
+except ImportError:  # captures fall back to pyautogui
+    mss = None
+
+try:
+    np = lazy_import("numpy")
+except ImportError:  # OCR line grouping falls back to plain Python
+    np = None
+
+try:
+    turbojpeg = lazy_import("turbojpeg")
+except ImportError:  # screenshots are encoded with Pillow
+    turbojpeg = None
+
+_turbojpeg = None  # None = not tried, False = libjpeg-turbo unavailable
+_mss_local = threading.local()  # one mss grabber per worker thread (its GDI handles are per-thread)
+
+
+def _get_sct():
+    """This thread's mss grabber, created on first use and kept for reuse."""
+    sct = getattr(_mss_local, "sct", None)
+    if sct is None:
+        sct = _mss_local.sct = mss.mss()
+    return sct
+
+
+def _region_box(region, screen_w: int, screen_h: int):
+    """(left, top, right, bottom) for a named screen region, or None for the full screen."""
+    regions = {
+        "top": (0, 0, screen_w, screen_h // 2),
+        "bottom": (0, screen_h // 2, screen_w, screen_h),
+        "left": (0, 0, screen_w // 2, screen_h),
+        "right": (screen_w // 2, 0, screen_w, screen_h),
+        "center": (screen_w // 4, screen_h // 4, 3 * screen_w // 4, 3 * screen_h // 4),
+    }
+    return regions.get(region)
 
 
+def _grab_mss(region=None):
+    """
+    Capture the primary monitor (or a named region of it) with mss.
+    Returns (PIL image, (left, top)) with the capture origin in absolute screen coordinates.
+    """
+    from PIL import Image
+    sct = _get_sct()
+    mon = sct.monitors[1]
+    box = _region_box(region, mon["width"], mon["height"])
+    if box:
+        rect = {"left": mon["left"] + box[0], "top": mon["top"] + box[1],
+                "width": box[2] - box[0], "height": box[3] - box[1]}
+    else:
+        rect = mon
+    raw = sct.grab(rect)
+    return Image.frombytes("RGB", raw.size, raw.rgb), (rect["left"], rect["top"])
+
 # ── OCR Engine ──────────────────────────────────────────────────────────────
 
 _ocr_available = None  # None = not checked, True/False = cached
+_UNRESOLVED = object()
+_tesseract = _UNRESOLVED  # pytesseract (path configured) or None, once resolved
+
+_TESS_PATHS = tuple(p for p in (
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+    os.path.join(os.environ["LOCALAPPDATA"], "Tesseract-OCR", "tesseract.exe") if os.environ.get("LOCALAPPDATA") else "",
+    r"C:\tools\Tesseract-OCR\tesseract.exe",
+) if p)
 
 
 def _get_tesseract():
-    """Get pytesseract module with auto-detected Tesseract path."""
+    """Get pytesseract module with auto-detected Tesseract path. Resolved once per process."""
+    global _tesseract
+    if _tesseract is _UNRESOLVED:
+        _tesseract = _find_tesseract()
+    return _tesseract
+
+
+def _find_tesseract():
     try:
         import pytesseract
-        common_paths = [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-            r"C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe".format(os.environ.get("USERNAME", "")),
-            r"C:\tools\Tesseract-OCR\tesseract.exe",
-        ]
-        for path in common_paths:
+        for path in _TESS_PATHS:
             if os.path.exists(path):
                 pytesseract.pytesseract.tesseract_cmd = path
                 return pytesseract
-        try:
-            subprocess.run(["tesseract", "--version"], capture_output=True, timeout=5)
+        # Plain PATH lookup; no need to spawn tesseract just to see if it exists
+        if shutil.which("tesseract"):
             return pytesseract
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            pass
         return None
     except ImportError:
         return None
 
 
-def _ocr_powershell_fallback(img, offset_x=0, offset_y=0):
-    """Fallback OCR using PowerShell + Windows built-in WinRT OCR."""
-    import tempfile
-    temp_path = os.path.join(tempfile.gettempdir(), "sharkon_ocr_temp.png")
-    try:
-        img.save(temp_path)
-    except Exception as e:
-        log.error(f"Failed to save temp OCR image: {e}")
-        return None
+# WinRT OCR runs in one long-lived PowerShell host: the Add-Type/reflection setup
+# is paid once, then each request is an image path on stdin answered by
+# "text|x|y|w|h" lines and an END sentinel on stdout.
 
-    ps_script = """
+_PS_OCR_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+[Console]::InputEncoding = [System.Text.Encoding]::UTF8  # paths arrive as UTF-8 from Python
+$out = [Console]::Out
 try {
     Add-Type -AssemblyName System.Runtime.WindowsRuntime
     $asTaskGeneric = ([System.WindowsRuntimeSystemExtensions].GetMethods() | Where-Object {
@@ -69,94 +141,182 @@ try {
     [void][Windows.Storage.StorageFile, Windows.Storage, ContentType=WindowsRuntime]
     [void][Windows.Media.Ocr.OcrEngine, Windows.Foundation, ContentType=WindowsRuntime]
     [void][Windows.Graphics.Imaging.BitmapDecoder, Windows.Foundation, ContentType=WindowsRuntime]
-    $file = WaitAsync ([Windows.Storage.StorageFile]::GetFileFromPathAsync('TEMP_PATH')) ([Windows.Storage.StorageFile])
-    $stream = WaitAsync ($file.OpenAsync([Windows.Storage.FileAccessMode]::Read)) ([Windows.Storage.Streams.IRandomAccessStream])
-    $decoder = WaitAsync ([Windows.Graphics.Imaging.BitmapDecoder]::CreateAsync($stream)) ([Windows.Graphics.Imaging.BitmapDecoder])
-    $bitmap = WaitAsync ($decoder.GetSoftwareBitmapAsync()) ([Windows.Graphics.Imaging.SoftwareBitmap])
     $engine = [Windows.Media.Ocr.OcrEngine]::TryCreateFromUserProfileLanguages()
-    if ($engine -eq $null) { Write-Error "OCR engine unavailable"; exit 1 }
-    $ocrResult = WaitAsync ($engine.RecognizeAsync($bitmap)) ([Windows.Media.Ocr.OcrResult])
-    foreach ($line in $ocrResult.Lines) {
-        foreach ($word in $line.Words) {
-            $r = $word.BoundingRect
-            Write-Output "$($word.Text)|$([int]$r.X)|$([int]$r.Y)|$([int]$r.Width)|$([int]$r.Height)"
+    $setupError = $null
+} catch { $setupError = $_.Exception.Message }
+while (($path = [Console]::In.ReadLine()) -ne $null) {
+    try {
+        if ($setupError) { throw $setupError }
+        if ($engine -eq $null) { throw "OCR engine unavailable" }
+        $file = WaitAsync ([Windows.Storage.StorageFile]::GetFileFromPathAsync($path)) ([Windows.Storage.StorageFile])
+        $stream = WaitAsync ($file.OpenAsync([Windows.Storage.FileAccessMode]::Read)) ([Windows.Storage.Streams.IRandomAccessStream])
+        try {
+            $decoder = WaitAsync ([Windows.Graphics.Imaging.BitmapDecoder]::CreateAsync($stream)) ([Windows.Graphics.Imaging.BitmapDecoder])
+            $bitmap = WaitAsync ($decoder.GetSoftwareBitmapAsync()) ([Windows.Graphics.Imaging.SoftwareBitmap])
+            $ocrResult = WaitAsync ($engine.RecognizeAsync($bitmap)) ([Windows.Media.Ocr.OcrResult])
+        } finally { $stream.Dispose() }
+        foreach ($line in $ocrResult.Lines) {
+            foreach ($word in $line.Words) {
+                $r = $word.BoundingRect
+                $out.WriteLine("$($word.Text)|$([int]$r.X)|$([int]$r.Y)|$([int]$r.Width)|$([int]$r.Height)")
+            }
         }
-    }
-} catch { Write-Error $_.Exception.Message; exit 1 }
-""".replace("TEMP_PATH", temp_path.replace("\\", "\\\\"))
+    } catch { $out.WriteLine("ERR|" + $_.Exception.Message) }
+    $out.WriteLine("END")
+    $out.Flush()
+}
+"""
 
-    try:
-        proc = subprocess.run(
-            ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', ps_script],
-            capture_output=True, text=True, timeout=20,
+# Encoded once: -EncodedCommand skips the command-line quoting that -Command needs
+_PS_OCR_ENCODED = base64.b64encode(_PS_OCR_SCRIPT.encode("utf-16-le")).decode("ascii")
+
+_PS_OCR_TIMEOUT = 20  # seconds per request
+_PS_OCR_HOST = None
+_PS_OCR_LOCK = threading.Lock()
+
+
+def _get_ps_ocr_host():
+    """Start the PowerShell OCR host if it isn't running. Caller holds _PS_OCR_LOCK."""
+    global _PS_OCR_HOST
+    if _PS_OCR_HOST is None or _PS_OCR_HOST.poll() is not None:
+        _PS_OCR_HOST = subprocess.Popen(
+            ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-EncodedCommand', _PS_OCR_ENCODED],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace", bufsize=1,
         )
-        if proc.returncode != 0:
-            log.warning(f"PowerShell OCR failed (rc={proc.returncode})")
+    return _PS_OCR_HOST
+
+
+def _kill_ps_ocr_host():
+    global _PS_OCR_HOST
+    host, _PS_OCR_HOST = _PS_OCR_HOST, None
+    if host is not None and host.poll() is None:
+        host.kill()
+
+
+def _ps_ocr_request(path: str):
+    """Send one image path to the OCR host. Returns its output lines, or None on failure."""
+    with _PS_OCR_LOCK:
+        host = _get_ps_ocr_host()
+        # readline() can't time out, so a stuck host is killed from a timer instead
+        watchdog = threading.Timer(_PS_OCR_TIMEOUT, host.kill)
+        watchdog.start()
+        try:
+            host.stdin.write(path + "\n")
+            host.stdin.flush()
+            lines = []
+            while True:
+                line = host.stdout.readline()
+                if not line:
+                    log.warning("PowerShell OCR host exited unexpectedly")
+                    _kill_ps_ocr_host()
+                    return None
+                line = line.rstrip("\r\n")
+                if line == "END":
+                    return lines
+                lines.append(line)
+        except OSError as e:
+            log.error(f"PowerShell OCR host error: {e}")
+            _kill_ps_ocr_host()
+            return None
+        finally:
+            watchdog.cancel()
+
+
+def _ocr_powershell_fallback(img, offset_x=0, offset_y=0):
+    """Fallback OCR using PowerShell + Windows built-in WinRT OCR."""
+    # Reused (overwritten) on every call rather than created and deleted each time
+    temp_path = os.path.join(tempfile.gettempdir(), "sharkon_ocr_temp.png")
+    try:
+        img.save(temp_path)
+    except Exception as e:
+        log.error(f"Failed to save temp OCR image: {e}")
+        return None
+
+    try:
+        output = _ps_ocr_request(temp_path)
+        if output is None:
+            return None
+        if output and output[0].startswith("ERR|"):
+            log.warning(f"PowerShell OCR failed: {output[0][4:]}")
             return None
         results = []
-        output = proc.stdout.strip()
-        if not output:
-            return results
-        for line in output.split('\n'):
-            line = line.strip()
-            if not line or '|' not in line:
-                continue
-            parts = line.split('|')
+        for line in output:
+            parts = line.rsplit('|', 4)
             if len(parts) < 5:
                 continue
             try:
-                text = parts[0]
+                text = parts[0].strip()
+                if not text:
+                    continue
                 x = int(parts[1]) + offset_x
                 y = int(parts[2]) + offset_y
                 w = int(parts[3])
                 h = int(parts[4])
                 results.append({
-                    "text": text, "x": x, "y": y, "w": w, "h": h,
+                    "text": text, "_lc": text.lower(), "x": x, "y": y, "w": w, "h": h,
                     "center_x": x + w // 2, "center_y": y + h // 2, "confidence": 80,
                 })
             except (ValueError, IndexError):
                 continue
         return results
-    except subprocess.TimeoutExpired:
-        return None
     except Exception as e:
         log.error(f"PowerShell OCR error: {e}")
         return None
-    finally:
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
+
+
+def _reading_order(r: dict):
+    return r["y"] // 20, r["x"]
+
+
+# Same pixels within this window -> same OCR. Keyed on a sparse sample of the frame,
+# so chained analyze_screen / click_text / find_text calls OCR an unchanged screen once.
+_SCREEN_OCR_TTL = 0.5      # seconds
+_SCREEN_HASH_STRIDE = 1021  # bytes between sampled pixels (prime, so it doesn't align with rows)
+_SCREEN_OCR_MEMO = None    # ((box, frame hash), time.monotonic() when OCR finished, results)
+                           # Module-level in the bot process, shared by the OCR threads
 
 
 def _ocr_screenshot(region=None):
-    """Take a screenshot and run OCR. Returns list of dicts or None if unavailable."""
-    global _ocr_available
-    from PIL import Image
+    """
+    Take a screenshot and run OCR. Returns list of dicts or None if unavailable.
+    Results come sorted in reading order (_reading_order) so callers never re-sort,
+    and each dict carries "_lc", the lowercased text, so lookups don't re-lower it.
+    """
+    global _SCREEN_OCR_MEMO
 
     if _ocr_available is False:
         return None
 
-    img = pyautogui.screenshot()
-    screen_w, screen_h = img.size
-
-    if region and region != "full":
-        regions = {
-            "top": (0, 0, screen_w, screen_h // 2),
-            "bottom": (0, screen_h // 2, screen_w, screen_h),
-            "left": (0, 0, screen_w // 2, screen_h),
-            "right": (screen_w // 2, 0, screen_w, screen_h),
-            "center": (screen_w // 4, screen_h // 4, 3 * screen_w // 4, 3 * screen_h // 4),
-        }
-        if region in regions:
-            box = regions[region]
-            img = img.crop(box)
-            offset_x, offset_y = box[0], box[1]
+    img = None
+    if mss is not None:
+        try:
+            img, (offset_x, offset_y) = _grab_mss(region)
+        except Exception as e:
+            log.warning(f"mss capture failed, falling back to pyautogui: {e}")
+    if img is None:
+        # Capture only the region's pixels; Tesseract cost scales with image area
+        box = _region_box(region, *screen_size())
+        if box:
+            img = pyautogui.screenshot(region=(box[0], box[1], box[2] - box[0], box[3] - box[1]))
         else:
-            offset_x, offset_y = 0, 0
-    else:
-        offset_x, offset_y = 0, 0
-
+            img = pyautogui.screenshot()
+        offset_x, offset_y = (box[0], box[1]) if box else (0, 0)
+
+    key = (offset_x, offset_y, img.size, hash(img.tobytes()[::_SCREEN_HASH_STRIDE]))
+    now = time.monotonic()
+    memo = _SCREEN_OCR_MEMO
+    if memo is not None and memo[0] == key and now - memo[1] < _SCREEN_OCR_TTL:
+        return memo[2]
+    results = _ocr_image(img, offset_x, offset_y)
+    # Stamped after OCR: a full-screen pass takes about as long as the TTL itself
+    _SCREEN_OCR_MEMO = (key, time.monotonic(), results) if results is not None else None
+    return results
+
+
+def _ocr_image(img, offset_x: int = 0, offset_y: int = 0):
+    """OCR an already-captured image with Tesseract, falling back to WinRT. None if unavailable."""
+    global _ocr_available
     pytesseract = _get_tesseract()
     if pytesseract is not None:
         try:
@@ -172,10 +332,11 @@ def _ocr_screenshot(region=None):
                     w = data["width"][i]
                     h = data["height"][i]
                     results.append({
-                        "text": text, "x": x, "y": y, "w": w, "h": h,
+                        "text": text, "_lc": text.lower(), "x": x, "y": y, "w": w, "h": h,
                         "center_x": x + w // 2, "center_y": y + h // 2, "confidence": conf,
                     })
             _ocr_available = True
+            results.sort(key=_reading_order)
             return results
         except Exception as e:
             log.warning(f"Tesseract OCR failed: {e}")
@@ -183,6 +344,7 @@ def _ocr_screenshot(region=None):
     ps_results = _ocr_powershell_fallback(img, offset_x, offset_y)
     if ps_results is not None:
         _ocr_available = True
+        ps_results.sort(key=_reading_order)
         return ps_results
 
     _ocr_available = False
@@ -190,6 +352,155 @@ def _ocr_screenshot(region=None):
     return None
 
 
+# Last full-screen OCR, reused by back-to-back find-then-act tools
+_OCR_CACHE_TTL = 0.2  # seconds
+_OCR_CACHE = None     # (time.monotonic() when OCR finished, results, word index)
+_OCR_INFLIGHT = None  # Task of the full-screen OCR currently running, shared by concurrent callers
+_OCR_GEN = 0          # Bumped on invalidation; results started before that are not cached
+
+
+def _build_word_index(results: list) -> dict:
+    """Map each lowercase word to the indices of the OCR results containing it."""
+    idx = {}
+    for i, r in enumerate(results):
+        for word in r["_lc"].split():
+            idx.setdefault(word, []).append(i)
+    return idx
+
+
+async def _run_ocr(region=None):
+    """Run _ocr_screenshot in a thread; Tesseract and the PowerShell host release the GIL while they work."""
+    return await asyncio.to_thread(_ocr_screenshot, region)
+
+
+async def _ocr_screen_fresh(gen: int):
+    global _OCR_CACHE, _OCR_INFLIGHT
+    try:
+        results = await _run_ocr()
+        if results is None:
+            if gen == _OCR_GEN:
+                _OCR_CACHE = None
+            return None, {}
+        idx = _build_word_index(results)
+        if gen == _OCR_GEN:
+            # Stamped on completion: a full-screen pass outlasts the TTL itself
+            _OCR_CACHE = (time.monotonic(), results, idx)
+        return results, idx
+    finally:
+        if _OCR_INFLIGHT is asyncio.current_task():
+            _OCR_INFLIGHT = None
+
+
+async def _ocr_screen_indexed():
+    """Full-screen OCR plus its word index, reusing a result younger than _OCR_CACHE_TTL."""
+    global _OCR_INFLIGHT
+    if _OCR_CACHE is not None and time.monotonic() - _OCR_CACHE[0] < _OCR_CACHE_TTL:
+        return _OCR_CACHE[1], _OCR_CACHE[2]
+    if _OCR_INFLIGHT is None:
+        _OCR_INFLIGHT = asyncio.ensure_future(_ocr_screen_fresh(_OCR_GEN))
+    # Shielded so one cancelled caller doesn't abort the OCR the others are waiting on
+    return await asyncio.shield(_OCR_INFLIGHT)
+
+
+async def _ocr_screen_cached():
+    """Full-screen OCR in a thread, reusing a result younger than _OCR_CACHE_TTL."""
+    results, _ = await _ocr_screen_indexed()
+    return results
+
+
+def _invalidate_ocr_cache():
+    """Drop the cached OCR after an action that changes what's on screen."""
+    global _OCR_CACHE, _OCR_INFLIGHT, _OCR_GEN
+    _OCR_GEN += 1
+    _OCR_CACHE = None
+    _OCR_INFLIGHT = None  # an OCR already running saw the old screen; the next caller starts anew
+
+
+def _join_line(items: list):
+    """Merge OCR words into (text, center_x, center_y) in a single pass."""
+    sx = sy = 0
+    parts = []
+    for w in items:
+        sx += w["center_x"]
+        sy += w["center_y"]
+        parts.append(w["text"])
+    n = len(items)
+    return " ".join(parts), sx // n, sy // n
+
+
+def _iter_line_matches(results: list, needle_lower: str):
+    """
+    Lazily yield {"text", "center_x", "center_y"} for each run of up to 8 words on
+    one line whose combined lowercase text contains needle_lower.
+    results must already be in reading order, as _ocr_screenshot returns them.
+    """
+    n = len(results)
+    for i, r in enumerate(results):
+        items = [r]
+        for j in range(i + 1, min(i + 8, n)):
+            next_r = results[j]
+            if abs(next_r["y"] - r["y"]) < 15:
+                items.append(next_r)
+            else:
+                break
+        if needle_lower in " ".join(item["_lc"] for item in items):
+            text, cx, cy = _join_line(items)
+            yield {"text": text, "center_x": cx, "center_y": cy}
+
+
+def _group_lines(results: list) -> list:
+    """
+    Group OCR words into lines: [(text, center_x, center_y), ...].
+    results must already be in reading order; a new line starts where y jumps by more than 15px.
+    """
+    if np is None:
+        lines, current, last_y = [], [], -999
+        for r in results:
+            if abs(r["y"] - last_y) > 15 and current:
+                lines.append(_join_line(current))
+                current = []
+            current.append(r)
+            last_y = r["y"]
+        if current:
+            lines.append(_join_line(current))
+        return lines
+
+    n = len(results)
+    ys = np.fromiter((r["y"] for r in results), dtype=np.int64, count=n)
+    cx = np.fromiter((r["center_x"] for r in results), dtype=np.int64, count=n)
+    cy = np.fromiter((r["center_y"] for r in results), dtype=np.int64, count=n)
+    starts = np.concatenate(([0], np.flatnonzero(np.abs(np.diff(ys)) > 15) + 1))
+    counts = np.diff(np.append(starts, n))
+    avg_x = np.add.reduceat(cx, starts) // counts
+    avg_y = np.add.reduceat(cy, starts) // counts
+    bounds = starts.tolist() + [n]
+    return [
+        (" ".join(r["text"] for r in results[bounds[k]:bounds[k + 1]]), int(avg_x[k]), int(avg_y[k]))
+        for k in range(len(starts))
+    ]
+
+
+async def _find_on_screen(query: str):
+    """
+    Return (first OCR result containing query, visible texts).
+    Whole-word hits on the query's first word are tried via the index before
+    falling back to a linear scan. visible is None when OCR is unavailable.
+    """
+    results, idx = await _ocr_screen_indexed()
+    if results is None:
+        return None, None
+    query_lc = query.lower().strip()
+    if query_lc:
+        candidates = idx.get(query_lc.split()[0])
+        for i in candidates or ():
+            if query_lc in results[i]["_lc"]:
+                return results[i], []
+        for r in results:
+            if query_lc in r["_lc"]:
+                return r, []
+    return None, [r["text"] for r in results if len(r["text"]) > 1][:20]
+
+
 # ── Definitions ─────────────────────────────────────────────────────────────
 
 SKILL_DEFINITIONS = [
@@ -199,7 +510,7 @@ SKILL_DEFINITIONS = [
             "Take a screenshot of the entire screen and SEND IT to the user as a photo in Telegram."
         ),
         "parameters": {
-            "filename": {"type": "string", "description": "Optional filename (default: 'screenshot.png')."},
+            "filename": {"type": "string", "description": "Optional filename (default: 'screenshot.jpg'). Saved as JPEG unless it ends in .png."},
         },
     },
     {
@@ -265,12 +576,58 @@ SKILL_DEFINITIONS = [
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
-async def screenshot(filename: str = "screenshot.png") -> ToolResult:
+def _get_turbojpeg():
+    """TurboJPEG encoder, created on first use (it loads the libjpeg-turbo DLL)."""
+    global _turbojpeg
+    if _turbojpeg is None and turbojpeg is None:
+        _turbojpeg = False
+    elif _turbojpeg is None:
+        try:
+            _turbojpeg = turbojpeg.TurboJPEG()
+        except Exception as e:
+            log.warning(f"libjpeg-turbo not available, using Pillow for screenshots: {e}")
+            _turbojpeg = False
+    return _turbojpeg
+
+
+def _grab_jpeg(quality: int = 85) -> bytes:
+    """Grab the primary monitor with mss and encode the raw BGRA buffer straight to JPEG."""
+    sct = _get_sct()
+    shot = sct.grab(sct.monitors[1])
+    arr = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+    return _turbojpeg.encode(arr, quality=quality, pixel_format=turbojpeg.TJPF_BGRX)
+
+
+def _save_screenshot(filepath: str):
+    as_jpeg = os.path.splitext(filepath)[1].lower() in ("", ".jpg", ".jpeg")
+    if mss is not None and as_jpeg and _get_turbojpeg():
+        try:
+            data = _grab_jpeg()
+            with open(filepath, "wb") as f:
+                f.write(data)
+            return
+        except Exception as e:
+            log.warning(f"mss/turbojpeg screenshot failed, falling back to Pillow: {e}")
+    img = None
+    if mss is not None:
+        try:
+            img, _ = _grab_mss()
+        except Exception as e:
+            log.warning(f"mss capture failed, falling back to pyautogui: {e}")
+    if img is None:
+        img = pyautogui.screenshot()
+    if as_jpeg:
+        # JPEG q85 is several times smaller and faster to encode than PNG for UI captures
+        img.convert("RGB").save(filepath, format="JPEG", quality=85, optimize=False)
+    else:
+        img.save(filepath)
+
+
+async def screenshot(filename: str = "screenshot.jpg") -> ToolResult:
     log.info(f"Taking screenshot: {filename}")
     try:
         filepath = os.path.join(CONFIG.MEDIA_DIR, filename)
-        img = pyautogui.screenshot()
-        img.save(filepath)
+        await asyncio.to_thread(_save_screenshot, filepath)
         return ToolResult(success=True, stdout=f"Screenshot saved to: {filepath}", stderr="", return_code=0, image_path=filepath)
     except Exception as e:
         log.error(f"screenshot error: {e}")
@@ -280,8 +637,7 @@ async def screenshot(filename: str = "screenshot.png") -> ToolResult:
 async def analyze_screen(region: str = "full") -> ToolResult:
     log.info(f"Analyzing screen (region: {region})...")
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, lambda: _ocr_screenshot(region))
+        results = await _run_ocr(region)
         if results is None:
             return ToolResult(
                 success=False, stdout="",
@@ -291,24 +647,7 @@ async def analyze_screen(region: str = "full") -> ToolResult:
         if not results:
             return ToolResult(success=True, stdout="No text detected on screen.", stderr="", return_code=0)
 
-        lines = []
-        current_line = []
-        last_y = -999
-        sorted_results = sorted(results, key=lambda r: (r["y"] // 20, r["x"]))
-        for r in sorted_results:
-            if abs(r["y"] - last_y) > 15 and current_line:
-                line_text = " ".join(w["text"] for w in current_line)
-                avg_x = sum(w["center_x"] for w in current_line) // len(current_line)
-                avg_y = sum(w["center_y"] for w in current_line) // len(current_line)
-                lines.append(f"  [{avg_x:4d}, {avg_y:4d}] {line_text}")
-                current_line = []
-            current_line.append(r)
-            last_y = r["y"]
-        if current_line:
-            line_text = " ".join(w["text"] for w in current_line)
-            avg_x = sum(w["center_x"] for w in current_line) // len(current_line)
-            avg_y = sum(w["center_y"] for w in current_line) // len(current_line)
-            lines.append(f"  [{avg_x:4d}, {avg_y:4d}] {line_text}")
+        lines = [f"  [{avg_x:4d}, {avg_y:4d}] {line_text}" for line_text, avg_x, avg_y in _group_lines(results)]
 
         output = f"Screen analysis ({len(results)} words, {len(lines)} lines):\n"
         output += "Format: [center_x, center_y] text_content\n"
@@ -325,32 +664,18 @@ async def analyze_screen(region: str = "full") -> ToolResult:
 async def click_text(text: str, button: str = "left", occurrence: int = 1) -> ToolResult:
     log.info(f"Clicking on text: '{text}'")
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, lambda: _ocr_screenshot())
+        results = await _ocr_screen_cached()
         if results is None:
             return ToolResult(success=False, stdout="", stderr=f"OCR unavailable — cannot find '{text}'.", return_code=1)
         if not results:
             return ToolResult(success=False, stdout="", stderr=f"No text found on screen.", return_code=1)
 
         text_lower = text.lower().strip()
-        matches = [r for r in results if r["text"].lower() == text_lower]
+        matches = [r for r in results if r["_lc"] == text_lower]
         if not matches:
-            sorted_results = sorted(results, key=lambda r: (r["y"] // 20, r["x"]))
-            for i, r in enumerate(sorted_results):
-                combined = r["text"]
-                combined_items = [r]
-                for j in range(i + 1, min(i + 8, len(sorted_results))):
-                    next_r = sorted_results[j]
-                    if abs(next_r["y"] - r["y"]) < 15:
-                        combined += " " + next_r["text"]
-                        combined_items.append(next_r)
-                    else:
-                        break
-                if text_lower in combined.lower():
-                    avg_x = sum(item["center_x"] for item in combined_items) // len(combined_items)
-                    avg_y = sum(item["center_y"] for item in combined_items) // len(combined_items)
-                    matches.append({"text": combined, "center_x": avg_x, "center_y": avg_y})
-                    break
+            first = next(_iter_line_matches(results, text_lower), None)
+            if first:
+                matches.append(first)
 
         if not matches:
             visible_texts = list(set(r["text"] for r in results if len(r["text"]) > 1))[:30]
@@ -360,6 +685,7 @@ async def click_text(text: str, button: str = "left", occurrence: int = 1) -> To
         match = matches[idx]
         cx, cy = match["center_x"], match["center_y"]
         pyautogui.click(x=cx, y=cy, button=button)
+        _invalidate_ocr_cache()
         return ToolResult(success=True, stdout=f"✅ Clicked on '{text}' at ({cx}, {cy}).", stderr="", return_code=0)
     except Exception as e:
         log.error(f"click_text error: {e}")
@@ -369,28 +695,13 @@ async def click_text(text: str, button: str = "left", occurrence: int = 1) -> To
 async def find_text_on_screen(text: str) -> ToolResult:
     log.info(f"Finding text on screen: '{text}'")
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, lambda: _ocr_screenshot())
+        results = await _ocr_screen_cached()
         if results is None:
             return ToolResult(success=False, stdout="", stderr="OCR unavailable.", return_code=1)
         text_lower = text.lower().strip()
-        matches = [r for r in results if text_lower in r["text"].lower()]
+        matches = [r for r in results if text_lower in r["_lc"]]
         if not matches:
-            sorted_results = sorted(results, key=lambda r: (r["y"] // 20, r["x"]))
-            for i, r in enumerate(sorted_results):
-                combined = r["text"]
-                combined_items = [r]
-                for j in range(i + 1, min(i + 8, len(sorted_results))):
-                    next_r = sorted_results[j]
-                    if abs(next_r["y"] - r["y"]) < 15:
-                        combined += " " + next_r["text"]
-                        combined_items.append(next_r)
-                    else:
-                        break
-                if text_lower in combined.lower():
-                    avg_x = sum(item["center_x"] for item in combined_items) // len(combined_items)
-                    avg_y = sum(item["center_y"] for item in combined_items) // len(combined_items)
-                    matches.append({"text": combined, "center_x": avg_x, "center_y": avg_y, "confidence": 80})
+            matches = list(_iter_line_matches(results, text_lower))
         if matches:
             lines = [f"Found '{text}' at {len(matches)} location(s):"]
             for i, m in enumerate(matches[:10], 1):
@@ -408,32 +719,24 @@ async def drag_text(source_text: str, target_text: str = None,
     log.info(f"Drag text: '{source_text}'")
     try:
         from skills.gui_automation import drag_and_drop as _drag
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, lambda: _ocr_screenshot())
-        if results is None:
+        source_match, visible = await _find_on_screen(source_text)
+        if visible is None:
             return ToolResult(success=False, stdout="", stderr="OCR unavailable.", return_code=1)
-        source_match = None
-        for r in results:
-            if source_text.lower() in r["text"].lower():
-                source_match = r
-                break
         if not source_match:
-            return ToolResult(success=False, stdout="", stderr=f"Source text '{source_text}' not found.", return_code=1)
+            return ToolResult(success=False, stdout="", stderr=f"Source text '{source_text}' not found. Visible: {', '.join(visible)}", return_code=1)
         sx, sy = source_match["center_x"], source_match["center_y"]
         if target_text:
-            target_match = None
-            for r in results:
-                if target_text.lower() in r["text"].lower():
-                    target_match = r
-                    break
+            target_match, visible = await _find_on_screen(target_text)
             if not target_match:
-                return ToolResult(success=False, stdout="", stderr=f"Target text '{target_text}' not found.", return_code=1)
+                return ToolResult(success=False, stdout="", stderr=f"Target text '{target_text}' not found. Visible: {', '.join(visible or [])}", return_code=1)
             tx, ty = target_match["center_x"], target_match["center_y"]
         elif target_x is not None and target_y is not None:
             tx, ty = target_x, target_y
         else:
             return ToolResult(success=False, stdout="", stderr="Must provide target_text or target_x/y.", return_code=1)
-        return await _drag(sx, sy, tx, ty, duration=duration)
+        result = await _drag(sx, sy, tx, ty, duration=duration)
+        _invalidate_ocr_cache()
+        return result
     except Exception as e:
         log.error(f"drag_text error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
@@ -443,53 +746,71 @@ async def hover_text(text: str, hover_time: float = 1.0) -> ToolResult:
     log.info(f"Hover over text: '{text}'")
     try:
         from skills.gui_automation import mouse_hover as _hover
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, lambda: _ocr_screenshot())
-        if results is None:
+        match, visible = await _find_on_screen(text)
+        if visible is None:
             return ToolResult(success=False, stdout="", stderr="OCR unavailable.", return_code=1)
-        text_lower = text.lower().strip()
-        for r in results:
-            if text_lower in r["text"].lower():
-                return await _hover(r["center_x"], r["center_y"], hover_time)
-        visible = [r["text"] for r in results if len(r["text"]) > 1][:20]
+        if match:
+            return await _hover(match["center_x"], match["center_y"], hover_time)
         return ToolResult(success=False, stdout="", stderr=f"Text '{text}' not found. Visible: {', '.join(visible)}", return_code=1)
     except Exception as e:
         log.error(f"hover_text error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
+def _process_name(pid: int) -> str:
+    """Executable name for pid without the extension, like Get-Process's ProcessName."""
+    if psutil is not None:
+        try:
+            return os.path.splitext(psutil.Process(pid).name())[0]
+        except Exception:
+            return ""
+    from ctypes import wintypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return ""
+    try:
+        buf = ctypes.create_unicode_buffer(1024)
+        size = wintypes.DWORD(len(buf))
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+            return ""
+        return os.path.splitext(os.path.basename(buf.value))[0]
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _active_window_info() -> str:
+    """Foreground window title, process, PID and geometry straight from user32."""
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    user32.GetForegroundWindow.restype = wintypes.HWND
+    hwnd = user32.GetForegroundWindow()
+    buf = ctypes.create_unicode_buffer(512)
+    user32.GetWindowTextW(hwnd, buf, 512)
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    rect = wintypes.RECT()
+    user32.GetWindowRect(hwnd, ctypes.byref(rect))
+    return (
+        f"Title: {buf.value}\n"
+        f"Process: {_process_name(pid.value)}\n"
+        f"PID: {pid.value}\n"
+        f"Position: ({rect.left}, {rect.top})\n"
+        f"Size: {rect.right - rect.left} x {rect.bottom - rect.top}"
+    )
+
+
 async def get_active_window() -> ToolResult:
     log.info("Getting active window info...")
     try:
-        from skills.system_commands import execute_cmd
-        ps_script = (
-            "Add-Type @'\n"
-            "using System;\nusing System.Runtime.InteropServices;\n"
-            "public class WinAPI {\n"
-            "    [DllImport(\"user32.dll\")] public static extern IntPtr GetForegroundWindow();\n"
-            "    [DllImport(\"user32.dll\")] public static extern int GetWindowText(IntPtr hWnd, System.Text.StringBuilder text, int count);\n"
-            "    [DllImport(\"user32.dll\")] public static extern uint GetWindowThreadProcessId(IntPtr hWnd, out uint processId);\n"
-            "    [DllImport(\"user32.dll\")] public static extern bool GetWindowRect(IntPtr hWnd, out RECT rect);\n"
-            "    public struct RECT { public int Left, Top, Right, Bottom; }\n"
-            "}\n'@\n"
-            "$hwnd = [WinAPI]::GetForegroundWindow()\n"
-            "$sb = New-Object System.Text.StringBuilder 256\n"
-            "[void][WinAPI]::GetWindowText($hwnd, $sb, 256)\n"
-            "$title = $sb.ToString()\n"
-            "$pid = 0\n[void][WinAPI]::GetWindowThreadProcessId($hwnd, [ref]$pid)\n"
-            "$proc = Get-Process -Id $pid -ErrorAction SilentlyContinue\n"
-            "$rect = New-Object WinAPI+RECT\n[void][WinAPI]::GetWindowRect($hwnd, [ref]$rect)\n"
-            "Write-Output \"Title: $title\"\nWrite-Output \"Process: $($proc.ProcessName)\"\n"
-            "Write-Output \"PID: $pid\"\nWrite-Output \"Position: ($($rect.Left), $($rect.Top))\"\n"
-            "Write-Output \"Size: $($rect.Right - $rect.Left) x $($rect.Bottom - $rect.Top)\"\n"
-        )
-        result = await execute_cmd(f'powershell -NoProfile -Command "{ps_script}"')
-        if result.success:
-            return ToolResult(success=True, stdout=result.stdout, stderr="", return_code=0)
-        result2 = await execute_cmd(
-            'powershell -NoProfile -Command "(Get-Process | Where-Object {$_.MainWindowTitle -ne \\\"\\\"} | Select-Object ProcessName, MainWindowTitle, Id | Format-Table -AutoSize | Out-String).Trim()"'
+        try:
+            return ToolResult(success=True, stdout=_active_window_info(), stderr="", return_code=0)
+        except Exception as e:
+            log.warning(f"user32 active-window lookup failed, listing windows via PowerShell: {e}")
+        # Tab-separated Id / name / title: skips Format-Table and Out-String, and needs no inner quotes
+        return await execute_cmd(
+            'powershell -NoProfile -Command "Get-Process | Where-Object {$_.MainWindowTitle} | ForEach-Object { $_.Id, $_.ProcessName, $_.MainWindowTitle -join [char]9 }"'
         )
-        return result2
     except Exception as e:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
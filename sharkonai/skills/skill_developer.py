@@ -642,7 +642,7 @@ async def delete_skill(filename: str) -> ToolResult:
 
     try:
         # Unregister tools from the global registry
-        from skills import TOOL_DEFINITIONS as all_defs, TOOL_MAP as all_tools, _loaded_modules
+        from skills import TOOL_DEFINITIONS as all_defs, TOOL_MAP as all_tools, _loaded_modules, invalidate_tools_prompt
         import sys
 
         module_name = f"skills_by_Sharkon.{filename[:-3]}"
@@ -656,6 +656,7 @@ async def delete_skill(filename: str) -> ToolResult:
             for name in old_map:
                 all_tools.pop(name, None)
             all_defs[:] = [d for d in all_defs if d.get("name") not in {dd.get("name") for dd in old_defs}]
+            invalidate_tools_prompt()
 
             del _loaded_modules[module_name]
             sys.modules.pop(module_name, None)
@@ -4,6 +4,7 @@ Execute CMD, PowerShell, and Python code on the host machine.
 """
 
 import asyncio
+import json
 import os
 
 from config import CONFIG
@@ -15,6 +16,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dataclasses import dataclass
 from typing import Optional
 
+# Context-manager timeout: no extra Task per call, unlike asyncio.wait_for
+try:
+    from asyncio import timeout as async_timeout  # Python 3.11+
+except ImportError:
+    from async_timeout import timeout as async_timeout
+
 
 @dataclass
 class ToolResult:
@@ -65,13 +72,21 @@ SKILL_DEFINITIONS = [
             "Execute Python code in a subprocess and return the output. "
             "Use this for calculations, data processing, file manipulation, "
             "web scraping, or any task that benefits from Python. "
-            "The code runs in a fresh Python process."
+            "Each call runs in a fresh Python interpreter unless fresh_process is false."
         ),
         "parameters": {
             "code": {
                 "type": "string",
                 "description": "The Python code to execute.",
-            }
+            },
+            "fresh_process": {
+                "type": "boolean",
+                "description": (
+                    "Run in a brand-new Python interpreter (default true). Set false to reuse a "
+                    "long-lived worker for faster repeated snippets; imported modules and "
+                    "background threads then persist between calls."
+                ),
+            },
         },
     },
 ]
@@ -79,6 +94,78 @@ SKILL_DEFINITIONS = [
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
+_DRAIN_CHUNK = 64 * 1024
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int) -> tuple:
+    """
+    Keep the first `limit` bytes of a pipe and discard the rest until EOF.
+    Returns (data, truncated). Draining (instead of stopping) keeps the child
+    from blocking on a full pipe, without buffering output we'd throw away.
+    """
+    try:
+        data = await stream.readexactly(limit)
+    except asyncio.IncompleteReadError as e:
+        return e.partial, False
+    truncated = False
+    while await stream.read(_DRAIN_CHUNK):
+        truncated = True
+    return data, truncated
+
+
+_TRUNC_OUT = "\n... [output truncated]"
+
+
+def _max_output_chars() -> int:
+    # getattr: config.py is user-owned and may predate this setting
+    return getattr(CONFIG, "MAX_OUTPUT_CHARS", 8000)
+
+
+def _cap_output(text: str, cut: bool = False) -> str:
+    """Clip text to CONFIG.MAX_OUTPUT_CHARS, marking it if anything was dropped."""
+    max_len = _max_output_chars()
+    if cut or len(text) > max_len:
+        return text[:max_len] + _TRUNC_OUT
+    return text
+
+
+async def collect_output(process: asyncio.subprocess.Process, what: str,
+                         stdin_data: bytes = None) -> ToolResult:
+    """Feed optional stdin, wait for the process, and build a ToolResult from its capped output."""
+    # Up to 4 bytes per UTF-8 char, so the character cap below still holds
+    read_limit = _max_output_chars() * 4
+    try:
+        async with async_timeout(CONFIG.CMD_TIMEOUT):
+            if stdin_data is not None:
+                process.stdin.write(stdin_data)
+                await process.stdin.drain()
+                process.stdin.close()
+            (stdout_bytes, stdout_cut), (stderr_bytes, stderr_cut) = await asyncio.gather(
+                _read_capped(process.stdout, read_limit),
+                _read_capped(process.stderr, read_limit),
+            )
+            await process.wait()
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        log.warning(f"Command timed out after {CONFIG.CMD_TIMEOUT}s: {what}")
+        return ToolResult(
+            success=False, stdout="",
+            stderr=f"Command timed out after {CONFIG.CMD_TIMEOUT} seconds.",
+            return_code=-1,
+        )
+
+    stdout = stdout_bytes.decode("utf-8", errors="replace").strip()
+    stderr = stderr_bytes.decode("utf-8", errors="replace").strip()
+    success = process.returncode == 0
+
+    stdout = _cap_output(stdout, stdout_cut)
+    stderr = _cap_output(stderr, stderr_cut)
+
+    log.info(f"Command result: success={success}, rc={process.returncode}")
+    return ToolResult(success=success, stdout=stdout, stderr=stderr, return_code=process.returncode)
+
+
 async def execute_cmd(command: str) -> ToolResult:
     """Execute a system command asynchronously and capture output."""
     log.info(f"Executing command: {command}")
@@ -89,34 +176,7 @@ async def execute_cmd(command: str) -> ToolResult:
             stderr=asyncio.subprocess.PIPE,
             shell=True,
         )
-        try:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                process.communicate(),
-                timeout=CONFIG.CMD_TIMEOUT,
-            )
-        except asyncio.TimeoutError:
-            process.kill()
-            await process.communicate()
-            log.warning(f"Command timed out after {CONFIG.CMD_TIMEOUT}s: {command}")
-            return ToolResult(
-                success=False, stdout="",
-                stderr=f"Command timed out after {CONFIG.CMD_TIMEOUT} seconds.",
-                return_code=-1,
-            )
-
-        stdout = stdout_bytes.decode("utf-8", errors="replace").strip()
-        stderr = stderr_bytes.decode("utf-8", errors="replace").strip()
-        success = process.returncode == 0
-
-        max_len = 8000
-        if len(stdout) > max_len:
-            stdout = stdout[:max_len] + "\n... [output truncated]"
-        if len(stderr) > max_len:
-            stderr = stderr[:max_len] + "\n... [output truncated]"
-
-        log.info(f"Command result: success={success}, rc={process.returncode}")
-        return ToolResult(success=success, stdout=stdout, stderr=stderr, return_code=process.returncode)
-
+        return await collect_output(process, command)
     except Exception as e:
         log.error(f"Command execution error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=-1)
@@ -129,23 +189,176 @@ async def execute_powershell(script: str) -> ToolResult:
     return await execute_cmd(command)
 
 
-async def run_python(code: str) -> ToolResult:
-    """Execute Python code in a subprocess."""
-    log.info(f"Running Python code: {code[:80]}...")
+# ── Python worker ───────────────────────────────────────────────────────────
+# run_python spawns a new interpreter per call by default. With
+# fresh_process=False, one worker is kept alive and fed length-prefixed source
+# on stdin; it replies on a private dup of its stdout with a length-prefixed
+# JSON [return_code, stdout, stderr, stdout_cut, stderr_cut]. During a call its
+# fd 1/2 are pipes drained by threads into capped buffers, so output from
+# child processes and C extensions is captured like in a fresh interpreter.
+
+_PY_WORKER_BOOTSTRAP = r"""
+import io, json, os, sys, tempfile, threading, traceback
+proto = os.fdopen(os.dup(1), "wb")
+null = os.open(os.devnull, os.O_WRONLY)
+os.dup2(null, 1)  # between calls, stray fd-level writes must not hit the protocol pipe
+src_in = sys.stdin.buffer
+home = os.getcwd()
+base_env = dict(os.environ)
+base_path = list(sys.path)
+cap = int(sys.argv[1]) * 4  # bytes; up to 4 per UTF-8 char
+
+def capture(fd):
+    r, w = os.pipe()
+    os.dup2(w, fd)
+    os.close(w)
+    state = {"buf": bytearray(), "cut": False}
+    def drain():
+        buf = state["buf"]
+        while True:
+            chunk = os.read(r, 65536)
+            if not chunk:
+                break
+            room = cap - len(buf)
+            if len(chunk) > room:
+                state["cut"] = True
+            if room > 0:
+                buf += chunk[:room]
+        os.close(r)
+    t = threading.Thread(target=drain, daemon=True)
+    t.start()
+    return state, t
+
+def text_stream(fd):
+    return io.TextIOWrapper(os.fdopen(fd, "wb", closefd=False), "utf-8", errors="replace", line_buffering=True)
+
+while True:
+    header = src_in.readline()
+    if not header:
+        break
+    src = src_in.read(int(header)).decode("utf-8")
+    fd, script = tempfile.mkstemp(suffix=".py", prefix="sharkon_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(src)
+    out, out_t = capture(1)
+    err, err_t = capture(2)
+    sys.stdout, sys.stderr, sys.stdin = text_stream(1), text_stream(2), io.StringIO()
+    sys.argv = [script]
+    rc = 0
     try:
-        temp_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "_temp_script.py")
-        with open(temp_path, "w", encoding="utf-8") as f:
-            f.write(code)
-        result = await execute_cmd(f'python "{temp_path}"')
+        exec(compile(src, script, "exec"), {"__name__": "__main__", "__file__": script})
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            rc = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            rc = 1
+    except BaseException:
+        traceback.print_exc()
+        rc = 1
+    for stream in (sys.stdout, sys.stderr):
         try:
-            os.remove(temp_path)
-        except OSError:
+            stream.flush()
+        except Exception:
             pass
-        return result
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    os.dup2(null, 1)
+    os.dup2(null, 2)
+    out_t.join(1)  # a lingering child process may still hold the pipe open
+    err_t.join(1)
+    os.chdir(home)
+    os.environ.clear()
+    os.environ.update(base_env)
+    sys.path[:] = base_path
+    try:
+        os.remove(script)
+    except OSError:
+        pass
+    reply = json.dumps([
+        rc, bytes(out["buf"]).decode("utf-8", "replace"), bytes(err["buf"]).decode("utf-8", "replace"),
+        out["cut"], err["cut"],
+    ]).encode("utf-8")
+    proto.write(b"%d\n" % len(reply) + reply)
+    proto.flush()
+"""
+
+_PY_WORKER: Optional[asyncio.subprocess.Process] = None
+_PY_WORKER_LOCK = asyncio.Lock()
+
+
+async def _get_py_worker() -> asyncio.subprocess.Process:
+    """Return the running Python worker, (re)starting it if needed."""
+    global _PY_WORKER
+    if _PY_WORKER is None or _PY_WORKER.returncode is not None:
+        _PY_WORKER = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", "-c", _PY_WORKER_BOOTSTRAP, str(_max_output_chars()),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    return _PY_WORKER
+
+
+async def _kill_py_worker():
+    global _PY_WORKER
+    worker, _PY_WORKER = _PY_WORKER, None
+    if worker is not None and worker.returncode is None:
+        worker.kill()
+        await worker.wait()
+
+
+async def _run_python_oneshot(code: str) -> ToolResult:
+    """Run code in a brand-new interpreter, piping the source through stdin (no temp file)."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        return await collect_output(process, "run_python (fresh process)", code.encode("utf-8"))
     except Exception as e:
+        log.error(f"Python execution error: {e}")
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=-1)
 
 
+async def run_python(code: str, fresh_process: bool = True) -> ToolResult:
+    """Execute Python code in a one-off interpreter, or in the persistent worker if requested."""
+    log.info(f"Running Python code: {code[:80]}...")
+    if fresh_process:
+        return await _run_python_oneshot(code)
+    async with _PY_WORKER_LOCK:
+        try:
+            worker = await _get_py_worker()
+            src = code.encode("utf-8")
+            async with async_timeout(CONFIG.CMD_TIMEOUT):
+                worker.stdin.write(b"%d\n" % len(src) + src)
+                await worker.stdin.drain()
+                header = await worker.stdout.readline()
+                if not header:
+                    raise ConnectionError("Python worker exited unexpectedly")
+                rc, stdout, stderr, stdout_cut, stderr_cut = json.loads(
+                    await worker.stdout.readexactly(int(header))
+                )
+        except asyncio.TimeoutError:
+            await _kill_py_worker()
+            log.warning(f"Python code timed out after {CONFIG.CMD_TIMEOUT}s")
+            return ToolResult(
+                success=False, stdout="",
+                stderr=f"Command timed out after {CONFIG.CMD_TIMEOUT} seconds.",
+                return_code=-1,
+            )
+        except Exception as e:
+            await _kill_py_worker()
+            log.error(f"Python worker error: {e}")
+            return ToolResult(success=False, stdout="", stderr=str(e), return_code=-1)
+
+    stdout = _cap_output(stdout.strip(), stdout_cut)
+    stderr = _cap_output(stderr.strip(), stderr_cut)
+    log.info(f"Python result: success={rc == 0}, rc={rc}")
+    return ToolResult(success=rc == 0, stdout=stdout, stderr=stderr, return_code=rc)
+
+
 # ── Skill Map ───────────────────────────────────────────────────────────────
 
 SKILL_MAP = {
@@ -4,16 +4,29 @@ System info, processes, app launcher, webcam.
 """
 
 import asyncio
+import bisect
 import json
 import os
 import platform
+import shutil
 import subprocess
 
-import pyautogui
-
 from config import CONFIG
 from logger import log
-from skills.system_commands import ToolResult, execute_cmd
+from skills import fmt_size, screen_size
+from skills.system_commands import ToolResult, collect_output, execute_cmd
+
+try:
+    import psutil
+except ImportError:  # falls back to PowerShell / CIM queries
+    psutil = None
+
+# Static host details, gathered once (platform.processor() hits the registry on Windows)
+_PLATFORM_LINES = [
+    f"OS: {platform.system()} {platform.release()} ({platform.version()})",
+    f"Machine: {platform.machine()}", f"Processor: {platform.processor()}",
+    f"Hostname: {platform.node()}", f"Python: {platform.python_version()}",
+]
 
 
 # ── App Registry ────────────────────────────────────────────────────────────
@@ -61,6 +74,40 @@ BROWSER_PATHS = {
     "firefox": [r"C:\Program Files\Mozilla Firefox\firefox.exe", r"C:\Program Files (x86)\Mozilla Firefox\firefox.exe"],
 }
 
+# Sorted registry keys for prefix lookups (e.g. "chrom" -> "chrome")
+_APP_NAMES = sorted(WINDOWS_APP_REGISTRY)
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """True if a and b differ by exactly one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _resolve_app(name: str):
+    """
+    Map a (possibly truncated or misspelled) app name to its registry command.
+    Tries an exact hit, then a unique prefix, then names one edit away.
+    Returns None if nothing matches unambiguously.
+    """
+    cmd = WINDOWS_APP_REGISTRY.get(name)
+    if cmd or len(name) < 3:
+        return cmd
+    lo = bisect.bisect_left(_APP_NAMES, name)
+    hi = bisect.bisect_left(_APP_NAMES, name + "\uffff")
+    cmds = {WINDOWS_APP_REGISTRY[k] for k in _APP_NAMES[lo:hi]}
+    if not cmds:
+        cmds = {v for k, v in WINDOWS_APP_REGISTRY.items() if _one_edit_apart(name, k)}
+    return cmds.pop() if len(cmds) == 1 else None
+
 
 # ── Definitions ─────────────────────────────────────────────────────────────
 
@@ -111,34 +158,42 @@ SKILL_DEFINITIONS = [
 
 # ── Implementations ─────────────────────────────────────────────────────────
 
+def _ram_line() -> str:
+    """RAM usage line via psutil, or a PowerShell CIM query when psutil is missing."""
+    if psutil is not None:
+        vm = psutil.virtual_memory()
+        total_mb, free_mb = vm.total / (1024 ** 2), vm.available / (1024 ** 2)
+    else:
+        proc = subprocess.run(
+            ['powershell', '-Command', "(Get-CimInstance Win32_OperatingSystem | Select-Object TotalVisibleMemorySize, FreePhysicalMemory | ConvertTo-Json)"],
+            capture_output=True, text=True, timeout=10,
+        )
+        if proc.returncode != 0:
+            return ""
+        mem = json.loads(proc.stdout)
+        total_mb = int(mem.get("TotalVisibleMemorySize", 0)) / 1024
+        free_mb = int(mem.get("FreePhysicalMemory", 0)) / 1024
+    return f"RAM: {total_mb - free_mb:.0f} MB used / {total_mb:.0f} MB total ({free_mb:.0f} MB free)"
+
+
 async def get_system_info() -> ToolResult:
     log.info("Getting system info...")
     try:
-        info_lines = [
-            f"OS: {platform.system()} {platform.release()} ({platform.version()})",
-            f"Machine: {platform.machine()}", f"Processor: {platform.processor()}",
-            f"Hostname: {platform.node()}", f"Python: {platform.python_version()}",
-        ]
+        info_lines = list(_PLATFORM_LINES)
         try:
-            import shutil
-            total, used, free = shutil.disk_usage("/")
+            total, used, free = await asyncio.to_thread(shutil.disk_usage, "/")
             info_lines.append(f"Disk (C:): {used / (1024**3):.1f} GB used / {total / (1024**3):.1f} GB total ({free / (1024**3):.1f} GB free)")
         except Exception:
             pass
         try:
-            proc = subprocess.run(
-                ['powershell', '-Command', "(Get-CimInstance Win32_OperatingSystem | Select-Object TotalVisibleMemorySize, FreePhysicalMemory | ConvertTo-Json)"],
-                capture_output=True, text=True, timeout=10,
-            )
-            if proc.returncode == 0:
-                mem = json.loads(proc.stdout)
-                total_mb = int(mem.get("TotalVisibleMemorySize", 0)) / 1024
-                free_mb = int(mem.get("FreePhysicalMemory", 0)) / 1024
-                info_lines.append(f"RAM: {total_mb - free_mb:.0f} MB used / {total_mb:.0f} MB total ({free_mb:.0f} MB free)")
+            # psutil answers in microseconds; only the PowerShell fallback needs a thread
+            ram = _ram_line() if psutil is not None else await asyncio.to_thread(_ram_line)
+            if ram:
+                info_lines.append(ram)
         except Exception:
             pass
         try:
-            w, h = pyautogui.size()
+            w, h = screen_size()
             info_lines.append(f"Screen: {w}x{h}")
         except Exception:
             pass
@@ -147,15 +202,41 @@ async def get_system_info() -> ToolResult:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
 
+def _psutil_process_table(filter_name: str = None) -> str:
+    """Top 40 processes by working set, formatted like the PowerShell table."""
+    needle = filter_name.lower() if filter_name else ""
+    procs = []
+    for p in psutil.process_iter(["pid", "name", "memory_info"]):
+        name = p.info["name"] or ""
+        mem = p.info["memory_info"]
+        if mem is None or (needle and needle not in name.lower()):
+            continue
+        procs.append((mem.rss, p.info["pid"], name))  # rss is the working set on Windows
+    procs.sort(reverse=True)
+    lines = [f"{'PID':>7} {'Name':<40} {'Memory(MB)':>10}", f"{'---':>7} {'----':<40} {'----------':>10}"]
+    lines.extend(f"{pid:>7} {name:<40} {rss / 1048576:>10.1f}" for rss, pid, name in procs[:40])
+    return "\n".join(lines)
+
+
 async def get_running_processes(filter_name: str = None) -> ToolResult:
     log.info(f"Getting running processes (filter: {filter_name})")
     try:
-        cmd = 'powershell.exe -NoProfile -Command "Get-Process'
+        if psutil is not None:
+            table = await asyncio.to_thread(_psutil_process_table, filter_name)
+            return ToolResult(success=True, stdout=table, stderr="", return_code=0)
+        # A CIM query filtered in the provider is several times faster than Get-Process | Where-Object
+        script = "Get-CimInstance -ClassName Win32_Process"
         if filter_name:
-            cmd += f" | Where-Object {{$_.ProcessName -like '*{filter_name}*'}}"
-        cmd += " | Sort-Object -Property WS -Descending | Select-Object -First 40 PID, ProcessName, @{N='Memory(MB)';E={[math]::Round($_.WS/1MB,1)}} | Format-Table -AutoSize"
-        cmd += '"'
-        return await execute_cmd(cmd)
+            name = "".join(c for c in filter_name if c not in "'\"`$%")
+            script += f" -Filter \"Name LIKE '%{name}%'\""
+        script += " | Sort-Object -Property WorkingSetSize -Descending | Select-Object -First 40 ProcessId, Name, @{N='Memory(MB)';E={[math]::Round($_.WorkingSetSize/1MB,1)}} | Format-Table -AutoSize"
+        # exec, not the shell: cmd.exe would expand the %...% in the WQL pattern
+        process = await asyncio.create_subprocess_exec(
+            "powershell.exe", "-NoProfile", "-Command", script,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        return await collect_output(process, "get_running_processes")
     except Exception as e:
         return ToolResult(success=False, stdout="", stderr=str(e), return_code=1)
 
@@ -170,8 +251,8 @@ async def kill_process(target: str) -> ToolResult:
 async def open_application(target: str) -> ToolResult:
     log.info(f"Opening application: {target}")
     target_lower = target.lower().strip()
-    if target_lower in WINDOWS_APP_REGISTRY:
-        cmd = WINDOWS_APP_REGISTRY[target_lower]
+    cmd = _resolve_app(target_lower)
+    if cmd:
         result = await execute_cmd(cmd)
         if result.success or result.return_code == 0:
             return ToolResult(success=True, stdout=f"✅ Opened {target}.", stderr="", return_code=0)
@@ -205,6 +286,39 @@ async def open_application(target: str) -> ToolResult:
     return ToolResult(success=False, stdout="", stderr=f"Could not open '{target}'.", return_code=1)
 
 
+_CAMERA_WARMUP_FRAMES = 10  # lets auto-exposure settle before the real shot
+
+
+def _sync_capture(cv2):
+    """Open the webcam, skip the warm-up frames without decoding them, return one fresh frame."""
+    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        return None, "Could not open webcam."
+    try:
+        # Small driver buffer so grab() doesn't hand back stale queued frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        for _ in range(_CAMERA_WARMUP_FRAMES):
+            cap.grab()
+        ret, frame = cap.read()
+    finally:
+        cap.release()
+    if not ret or frame is None:
+        return None, "Failed to capture frame."
+    return frame, ""
+
+
+def _sync_save_jpeg(cv2, frame, filepath: str) -> int:
+    """Encode frame as JPEG q85 and write it; returns the byte size."""
+    ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    with open(filepath, "wb") as f:
+        f.write(buf.tobytes())
+    return buf.nbytes
+
+
 async def take_photo(filename: str = "camera_photo.jpg") -> ToolResult:
     log.info(f"Taking webcam photo: {filename}")
     filepath = os.path.join(CONFIG.MEDIA_DIR, filename)
@@ -216,22 +330,12 @@ async def take_photo(filename: str = "camera_photo.jpg") -> ToolResult:
             return ToolResult(success=False, stdout="", stderr="opencv-python install failed: " + install_result.stderr, return_code=1)
         import cv2
     try:
-        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        if not cap.isOpened():
-            cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            return ToolResult(success=False, stdout="", stderr="Could not open webcam.", return_code=1)
-        for _ in range(10):
-            cap.read()
-            await asyncio.sleep(0.05)
-        ret, frame = cap.read()
-        cap.release()
-        if not ret or frame is None:
-            return ToolResult(success=False, stdout="", stderr="Failed to capture frame.", return_code=1)
-        cv2.imwrite(filepath, frame)
+        frame, error = await asyncio.to_thread(_sync_capture, cv2)
+        if frame is None:
+            return ToolResult(success=False, stdout="", stderr=error, return_code=1)
+        size = await asyncio.to_thread(_sync_save_jpeg, cv2, frame, filepath)
         height, width = frame.shape[:2]
-        size = os.path.getsize(filepath)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
+        size_str = fmt_size(size)
         return ToolResult(success=True, stdout=f"📸 Photo captured! {width}x{height}, {size_str}", stderr="", return_code=0, image_path=filepath)
     except Exception as e:
         log.error(f"take_photo error: {e}")
@@ -19,6 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dataclasses import dataclass
 from typing import Optional
 
+from config import CONFIG
 from logger import log
 
 
@@ -48,6 +49,7 @@ from skills import (
 
 # Re-export transcribe_audio for the telegram handler (voice message support)
 from skills.audio_transcription import transcribe_audio
+from skills.system_commands import async_timeout
 
 
 def _coerce_tool_result(raw) -> ToolResult:
@@ -86,34 +88,36 @@ def _coerce_tool_result(raw) -> ToolResult:
 
 async def dispatch_tool(action: str, parameters: dict) -> ToolResult:
     """Dispatch a tool call by name with the given parameters."""
-    if action not in TOOL_MAP:
+    # A plain dict lookup on purpose: TOOL_MAP is live (skills register and
+    # unregister at runtime), and an index table built from it would need
+    # rebuilding on every reload while still starting with a dict lookup.
+    func = TOOL_MAP.get(action)
+    if func is None:
+        # Joined on demand: TOOL_MAP changes when skills are hot-reloaded
         return ToolResult(
             success=False, stdout="",
-            stderr=f"Unknown tool: {action}. Available: {list(TOOL_MAP.keys())}",
+            stderr=f"Unknown tool: {action}. Available: {', '.join(TOOL_MAP)}",
             return_code=1,
         )
 
-    func = TOOL_MAP[action]
     try:
         # Filter out None-valued params (AI sometimes sends null for optional args)
-        clean_params = {k: v for k, v in parameters.items() if v is not None}
-        from config import CONFIG
+        if None in parameters.values():
+            clean_params = {k: v for k, v in parameters.items() if v is not None}
+        else:
+            clean_params = parameters
 
         # Try keyword-argument dispatch first (built-in skill style).
         # If that fails with TypeError, fall back to passing the whole dict
         # as a single positional arg (AI-generated skill style: def tool(params)).
         try:
-            result = await asyncio.wait_for(
-                func(**clean_params),
-                timeout=CONFIG.TOOL_TIMEOUT,
-            )
+            async with async_timeout(CONFIG.TOOL_TIMEOUT):
+                result = await func(**clean_params)
         except TypeError as e:
             if "unexpected keyword argument" in str(e) or "positional argument" in str(e):
                 log.debug(f"Retrying {action} with single-dict param pattern")
-                result = await asyncio.wait_for(
-                    func(clean_params),
-                    timeout=CONFIG.TOOL_TIMEOUT,
-                )
+                async with async_timeout(CONFIG.TOOL_TIMEOUT):
+                    result = await func(clean_params)
             else:
                 raise
 
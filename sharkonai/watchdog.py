@@ -12,6 +12,7 @@ from config import CONFIG
 from logger import log
 from memory import Memory
 from cognition_loop import CognitionLoop
+from skills.system_commands import async_timeout
 
 
 class Watchdog:
@@ -45,19 +46,26 @@ class Watchdog:
         log.info("Watchdog stopped.")
 
     async def _monitor(self):
-        """Main monitoring loop."""
+        """Main monitoring loop — wakes on each cognition heartbeat, or when one is overdue."""
+        heartbeat = self.cognition.heartbeat
+        max_age = CONFIG.COGNITION_INTERVAL_SECONDS * 3
         while self._running:
             try:
-                await self._check_health()
+                try:
+                    async with async_timeout(max_age):
+                        await heartbeat.wait()
+                    heartbeat.clear()
+                    stale = False
+                except asyncio.TimeoutError:
+                    stale = True
+                await self._check_health(stale)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.error(f"Watchdog monitoring error: {e}", exc_info=True)
 
-            await asyncio.sleep(CONFIG.WATCHDOG_CHECK_INTERVAL)
-
-    async def _check_health(self):
-        """Check health of all components."""
+    async def _check_health(self, stale: bool = False):
+        """Check health of all components. The stored heartbeat is only read once it is overdue."""
 
         # Check cognition loop
         if not self.cognition.is_running:
@@ -81,8 +89,18 @@ class Watchdog:
                     "Manual intervention required."
                 )
 
+        # Update watchdog state, reading the stored heartbeat alongside it once overdue
+        state_write = self.memory.set_state_many({
+            "watchdog_last_check": datetime.utcnow().isoformat(),
+            "watchdog_restart_count": str(self._restart_count),
+        })
+        if stale:
+            last_hb, _ = await asyncio.gather(self.memory.get_state("last_heartbeat"), state_write)
+        else:
+            await state_write
+            last_hb = None
+
         # Check heartbeat freshness
-        last_hb = await self.memory.get_state("last_heartbeat")
         if last_hb:
             try:
                 hb_time = datetime.fromisoformat(last_hb)
@@ -96,10 +114,6 @@ class Watchdog:
             except ValueError:
                 pass
 
-        # Update watchdog state
-        await self.memory.set_state("watchdog_last_check", datetime.utcnow().isoformat())
-        await self.memory.set_state("watchdog_restart_count", str(self._restart_count))
-
     @property
     def is_running(self) -> bool:
         return self._running